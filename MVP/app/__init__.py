@@ -1 +1,5 @@
-from .app import run_app
\ No newline at end of file
+def run_app():
+    """Start the Gradio UI; gradio and the app module are imported on first call."""
+    from .app import run_app as _run_app
+
+    _run_app()
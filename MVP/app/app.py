@@ -1,81 +1,265 @@
 # client.py (runs on your local laptop)
-import gradio as gr
-import requests
-import base64
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
-from MVP.utils.filtering import filter_text
-from MVP.utils.database_management import SimpleMongoManager
+from MVP.utils.cache import ResponseCache, DEFAULT_CACHE_PATH
+from MVP.utils.pipeline import fetch_ocr_results, extract_infos
+
+# gradio, requests and pymongo are imported, and MongoDB / the OCR server are
+# contacted, on first use only: importing this module stays cheap for scripts,
+# tests and worker processes. Check with: python MVP/benchmarks/import_profile.py
 
 # Your VM's address (use localhost:8000 if using SSH tunnel)
 VM_URL = "http://38.80.123.152:8000"
 
+# Several replicas can be given as a comma-separated list; requests go to the
+# least-loaded healthy one and fail over to the others
+VM_URLS = [url.strip() for url in os.environ.get("OCR_SERVER_URLS", VM_URL).split(",") if url.strip()]
+
+# Batch mode: documents in flight to the OCR server at once. The server batches
+# concurrent requests on the GPU, so this mostly hides network round trips.
+MAX_CONCURRENT_UPLOADS = int(os.environ.get("OCR_MAX_CONCURRENT_UPLOADS", 8))
+
+# Optional client-side shrinking before upload (OCR_UPLOAD_SHRINK=1; off by default
+# because it re-encodes scans as lossy JPEG). The defaults match the server's
+# OCR_MAX_IMAGE_SIDE / OCR_MAX_MEGAPIXELS, so the model sees the same resolution.
+UPLOAD_SHRINK = os.environ.get("OCR_UPLOAD_SHRINK") == "1"
+# OCR_VERBOSE=1 prints per-document upload / cache statistics
+VERBOSE = os.environ.get("OCR_VERBOSE") == "1"
+UPLOAD_SHRINK_CONFIG = {
+    "max_side": int(os.environ.get("OCR_UPLOAD_MAX_SIDE", 3500)),
+    "max_megapixels": float(os.environ.get("OCR_UPLOAD_MAX_MEGAPIXELS", 10)),
+    "image_format": os.environ.get("OCR_UPLOAD_FORMAT", "JPEG"),
+    "quality": int(os.environ.get("OCR_UPLOAD_QUALITY", 90)),
+}
+
+# Local cache of OCR results keyed by file hash + model + upload settings, so
+# re-processing a known document skips the server (OCR_RESPONSE_CACHE=0 disables
+# it). Inspect or purge it with: python -m MVP.utils.cache stats | list | purge
+RESPONSE_CACHE = os.environ.get("OCR_RESPONSE_CACHE", "1") != "0"
+
+_lock = threading.Lock()
+_client = None
+_response_cache = None
+_store = None
+
+def get_client():
+    """One shared client: keep-alive connections, timeouts, retries and a circuit breaker"""
+    global _client
+    with _lock:
+        if _client is None:
+            from MVP.utils.client import OCRClient
+
+            _client = OCRClient(
+                VM_URLS,
+                connect_timeout=float(os.environ.get("OCR_CONNECT_TIMEOUT", 3.05)),
+                read_timeout=float(os.environ.get("OCR_READ_TIMEOUT", 120)),
+                max_retries=int(os.environ.get("OCR_MAX_RETRIES", 3)),
+                pool_size=MAX_CONCURRENT_UPLOADS,
+                hedge_after=float(os.environ.get("OCR_HEDGE_AFTER", 0)) or None
+            )
+        return _client
+
+def get_response_cache():
+    """Shared response cache, or None when OCR_RESPONSE_CACHE=0"""
+    global _response_cache
+    if not RESPONSE_CACHE:
+        return None
+    with _lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                os.environ.get("OCR_RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                max_bytes=int(float(os.environ.get("OCR_RESPONSE_CACHE_MAX_MB", 500)) * 1024 * 1024)
+            )
+        return _response_cache
 
-manager = SimpleMongoManager(
-    connection_string="mongodb://localhost:27017/",
-    database_name="OCR",
-    collection_name="OCR"
-)
+def get_store():
+    """
+    Results are saved in the background: journaled to a local spool file, then
+    bulk-inserted with retries, so a slow or down MongoDB never blocks the UI.
+    Anything not yet written at exit stays in the spool and is saved on the next start.
+    """
+    global _store
+    with _lock:
+        if _store is None:
+            from MVP.utils.database_management import SimpleMongoManager, WriteBehindWriter, DEFAULT_SPOOL_PATH
 
-def image_to_base64(image_path):
-    """Convert image file to base64 string"""
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode('utf-8')
+            # The connection itself is opened by the writer thread
+            _store = WriteBehindWriter(
+                partial(
+                    SimpleMongoManager,
+                    connection_string="mongodb://localhost:27017/",
+                    database_name="OCR",
+                    collection_name="OCR"
+                ),
+                spool_path=os.environ.get("OCR_MONGO_SPOOL_PATH", DEFAULT_SPOOL_PATH)
+            )
+            atexit.register(_store.close, 5)
+        return _store
+
+def ocr_document(path, model_choice):
+    """
+    Send one document to the OCR server and run the COO filtering on the results.
+
+    Returns:
+        Tuple of (extracted infos, one per result entry; upload size summary)
+
+    Raises:
+        OCRClientError: if the server answers with an error status or cannot be reached
+    """
+    results, upload = fetch_ocr_results(
+        get_client(),
+        path,
+        model_choice,
+        shrink_config=UPLOAD_SHRINK_CONFIG if UPLOAD_SHRINK else None,
+        cache=get_response_cache(),
+        verbose=VERBOSE
+    )
+    if VERBOSE and upload["cached"]:
+        print(f"[cache] {os.path.basename(path)}: cached OCR results, nothing uploaded")
+    elif VERBOSE:
+        saved = upload["original_bytes"] - upload["bytes"]
+        print(
+            f"[upload] {os.path.basename(path)}: {upload['original_bytes'] / 1e6:.2f} MB -> "
+            f"{upload['bytes'] / 1e6:.2f} MB ({saved / 1e6:.2f} MB saved, scale {upload['scale']:.3f})"
+        )
+
+    return extract_infos(results), upload
 
 def process_document(file, model_choice):
     try:
-        # Convert uploaded file to base64
-        image_b64 = image_to_base64(file.name)
-        
-        # Prepare JSON payload
-        payload = {
-            "image": image_b64,
-            "model_name": model_choice
-        }
-        
-        # Send request to remote server
-        response = requests.post(f"{VM_URL}/ocr", json=payload)
-        
-        if response.status_code == 200:
-            data = response.json()
-            results = data['results']
-            
-            infos = []
-            for res in results:
-                info_extracted = filter_text(res, image_dims=res["image_dims"][:-1])
-                infos.append(info_extracted)
-                
-            manager.save_batch(infos)
-            return infos
-        else:
-            return f"Error: {response.status_code} - {response.text}", ""
-    
+        infos, _ = ocr_document(file.name, model_choice)
+        get_store().submit(infos)
+        return infos
     except Exception as e:
         return f"Error: {str(e)}", ""
 
+def process_documents(files, model_choice, progress=None):
+    """
+    Batch mode: OCR many documents concurrently (up to MAX_CONCURRENT_UPLOADS in flight),
+    update the status table as each one finishes, then save all results in one bulk write.
+    """
+    progress = progress or (lambda *args, **kwargs: None)
+    if not files:
+        yield [], {}
+        return
+
+    names = [os.path.basename(file.name) for file in files]
+    rows = [[name, "queued", "", ""] for name in names]
+    infos_by_file = {}
+    progress(0, desc=f"0/{len(files)} documents")
+    yield rows, {}
+
+    def timed_ocr(path):
+        started = time.perf_counter()
+        infos, upload = ocr_document(path, model_choice)
+        return infos, upload, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_UPLOADS) as pool:
+        futures = {pool.submit(timed_ocr, file.name): i for i, file in enumerate(files)}
+        for i in range(min(len(files), MAX_CONCURRENT_UPLOADS)):
+            rows[i][1] = "processing"
+        yield rows, {}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                infos_by_file[i], upload, elapsed = future.result()
+                rows[i][1:] = [
+                    "done",
+                    f"{elapsed:.1f}s",
+                    "cached" if upload["cached"]
+                    else f"{upload['original_bytes'] / 1e6:.2f} -> {upload['bytes'] / 1e6:.2f} MB"
+                ]
+            except Exception as e:
+                rows[i][1] = f"error: {e}"
+
+            # The pool starts the next queued document as soon as one finishes
+            waiting = [row for row in rows if row[1] == "queued"]
+            if waiting:
+                waiting[0][1] = "processing"
+
+            progress(done / len(files), desc=f"{done}/{len(files)} documents")
+            yield rows, {names[j]: infos for j, infos in sorted(infos_by_file.items())}
+
+    # Queued for one bulk insert, in upload order
+    documents = [
+        {**info, "source_file": names[i]}
+        for i, infos in sorted(infos_by_file.items())
+        for info in infos
+    ]
+    if documents:
+        try:
+            get_store().submit(documents)
+        except Exception as e:
+            import gradio as gr
+
+            gr.Warning(f"Queueing results for MongoDB failed: {e}")
+
+    yield rows, {names[i]: infos for i, infos in sorted(infos_by_file.items())}
+
 def run_app():
+    import gradio as gr
+
+    def process_documents_ui(files, model_choice, progress=gr.Progress()):
+        # Gradio only tracks progress for a gr.Progress() default argument
+        yield from process_documents(files, model_choice, progress)
+
+    # Start the writer now so results left in the spool by the last run get saved
+    get_store()
+
     # Create Gradio interface
     with gr.Blocks(title="OCR Document Processor") as interface:
         gr.Markdown("# 📄 OCR Document Processor")
         gr.Markdown("Upload an image to extract text using PaddleOCR")
-        
-        with gr.Row():
-            with gr.Column():
-                file_input = gr.File(label="Upload Document Image", file_types=["image"])
-                model_dropdown = gr.Dropdown(
-                    choices=["PaddleOCR", "PaddleStructure"], 
-                    value="PaddleOCR",
-                    label="Model Selection"
-                )
-                submit_btn = gr.Button("Process Document", variant="primary")
-            
-            with gr.Column():
-                # text_output = gr.Textbox(label="Extracted Text", lines=15)
-                # raw_output = gr.Textbox(label="Raw Results (JSON)", lines=10)
-                text_output = gr.JSON(label="Raw Results (JSON)")
-        submit_btn.click(
-            fn=process_document,
-            inputs=[file_input, model_dropdown],
-            outputs=[text_output]
-        )
 
-    interface.launch(share=False)
\ No newline at end of file
+        with gr.Tab("Single document"):
+            with gr.Row():
+                with gr.Column():
+                    file_input = gr.File(label="Upload Document Image", file_types=["image"])
+                    model_dropdown = gr.Dropdown(
+                        choices=["PaddleOCR", "PaddleStructure"],
+                        value="PaddleOCR",
+                        label="Model Selection"
+                    )
+                    submit_btn = gr.Button("Process Document", variant="primary")
+
+                with gr.Column():
+                    # text_output = gr.Textbox(label="Extracted Text", lines=15)
+                    # raw_output = gr.Textbox(label="Raw Results (JSON)", lines=10)
+                    text_output = gr.JSON(label="Raw Results (JSON)")
+            submit_btn.click(
+                fn=process_document,
+                inputs=[file_input, model_dropdown],
+                outputs=[text_output]
+            )
+
+        with gr.Tab("Batch"):
+            with gr.Row():
+                with gr.Column():
+                    files_input = gr.File(
+                        label="Upload Document Images", file_types=["image"], file_count="multiple"
+                    )
+                    batch_model_dropdown = gr.Dropdown(
+                        choices=["PaddleOCR", "PaddleStructure"],
+                        value="PaddleOCR",
+                        label="Model Selection"
+                    )
+                    batch_btn = gr.Button("Process Documents", variant="primary")
+
+                with gr.Column():
+                    status_output = gr.Dataframe(
+                        headers=["Document", "Status", "Time", "Upload"], label="Progress", interactive=False
+                    )
+                    batch_output = gr.JSON(label="Results per document (JSON)")
+            batch_btn.click(
+                fn=process_documents_ui,
+                inputs=[files_input, batch_model_dropdown],
+                outputs=[status_output, batch_output]
+            )
+
+    interface.launch(share=False)
@@ -0,0 +1,138 @@
+"""
+Micro-batching stage in front of the OCR model.
+Collects requests that arrive within a short window and runs them as one predict call.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+
+class MicroBatcher:
+    """Groups concurrent OCR requests into a single model call."""
+
+    def __init__(self,
+                 predict_fn: Callable[[Any, List[Any]], List[Any]],
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0):
+        """
+        Start the batching worker.
+
+        Args:
+            predict_fn: Callable taking (model key, list of images) and returning one result per image
+            max_batch_size: Maximum number of images sent to the model in one call
+            max_wait_ms: How long the first request of a batch waits for company
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._batch_sizes: Dict[int, int] = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="ocr-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, image: Any, key: Any = None) -> Future:
+        """
+        Queue an image for inference.
+
+        Args:
+            image: Image passed to predict_fn
+            key: Model the image is meant for; only images with equal keys share a call
+
+        Returns:
+            Future resolved with this image's own prediction result
+        """
+        future = Future()
+        self._queue.put((key, image, future, time.perf_counter()))
+        return future
+
+    def close(self):
+        """Stop the worker after the already queued requests are served."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-wait statistics since startup."""
+        with self._stats_lock:
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "batch_size_counts": dict(sorted(self._batch_sizes.items())),
+                "avg_queue_wait_ms": 1000 * self._wait_total / self._requests if self._requests else 0.0,
+                "max_queue_wait_ms": 1000 * self._wait_max,
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": 1000 * self.max_wait,
+            }
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes."""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = first[3] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Serve what we have, then let the main loop see the sentinel
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _record(self, batch, started: float):
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            for _, _, _, enqueued in batch:
+                wait = started - enqueued
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+    def _run(self):
+        while True:
+            collected = self._collect()
+            if collected is None:
+                return
+
+            # One predict call per model among the collected requests
+            groups: Dict[Any, list] = {}
+            for item in collected:
+                groups.setdefault(item[0], []).append(item)
+
+            for key, batch in groups.items():
+                self._predict(key, batch)
+
+    def _predict(self, key, batch):
+        self._record(batch, time.perf_counter())
+        images = [image for _, image, _, _ in batch]
+        try:
+            results = list(self.predict_fn(key, images))
+            if len(results) != len(images):
+                raise RuntimeError(
+                    f"Model returned {len(results)} results for {len(images)} images"
+                )
+        except Exception as e:
+            for _, _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future, _), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,141 @@
+"""
+Content-addressed cache for OCR results.
+In-memory LRU in front of a SQLite store, so repeated uploads survive server restarts.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResultCache:
+    """Two-level (memory + disk) LRU cache with per-entry TTL."""
+
+    def __init__(self,
+                 path: str,
+                 max_memory_entries: int = 256,
+                 max_disk_entries: int = 10000,
+                 ttl_seconds: float = 7 * 24 * 3600):
+        """
+        Open (or create) the on-disk store.
+
+        Args:
+            path: SQLite file backing the cache
+            max_memory_entries: Entries kept in the in-memory LRU
+            max_disk_entries: Entries kept on disk; least recently used are evicted
+            ttl_seconds: Default lifetime of an entry
+        """
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(image_bytes: bytes, model_config: Dict[str, Any]) -> str:
+        """Hash the image bytes together with the model configuration."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(model_config, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(image_bytes)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+                self._misses += 1
+                return None
+
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            self._disk_hits += 1
+            return value
+
+    def put(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a JSON-serializable value under key."""
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._evict_disk()
+            self._db.commit()
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+            self._evictions += excess
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current sizes."""
+        with self._lock:
+            disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            return {
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._memory_hits + self._disk_hits) / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def close(self):
+        """Close the on-disk store."""
+        with self._lock:
+            self._db.close()
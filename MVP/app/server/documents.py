@@ -0,0 +1,97 @@
+"""
+Lazy page rasterization for multi-page documents (PDF, TIFF and other multi-frame images).
+Pages are produced one at a time so memory stays bounded regardless of document length.
+"""
+
+import threading
+from io import BytesIO
+from typing import Iterator, Tuple
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from preprocess import to_rgb_array, ImageTooLarge
+
+# PDFium is not thread-safe: every pypdfium2 call (open, render, close) holds this lock,
+# since pages of several documents are rasterized on different worker threads
+_PDFIUM_LOCK = threading.Lock()
+
+
+def is_pdf(data: bytes) -> bool:
+    """Check the PDF magic bytes."""
+    return data[:5] == b"%PDF-"
+
+
+def open_document(data: bytes, dpi: int = 200, max_pixels: int = 0) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    Open a PDF or (multi-frame) image without rasterizing it.
+
+    Args:
+        data: Raw file bytes
+        dpi: Rendering resolution for PDF pages
+        max_pixels: Pages larger than this raise ImageTooLarge when reached (0 disables)
+
+    Returns:
+        Tuple of (page count, iterator yielding one RGB uint8 array per page)
+
+    Raises:
+        ValueError: if the bytes are neither a PDF nor a readable image
+    """
+    if is_pdf(data):
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            raise ImportError("pypdfium2 is required for PDF input. Install with: pip install pypdfium2")
+
+        with _PDFIUM_LOCK:
+            try:
+                pdf = pdfium.PdfDocument(data)
+            except pdfium.PdfiumError as e:
+                raise ValueError(f"Cannot open PDF: {e}")
+            page_count = len(pdf)
+        return page_count, _iter_pdf_pages(pdf, page_count, scale=dpi / 72, max_pixels=max_pixels)
+
+    try:
+        image = Image.open(BytesIO(data))
+    except Exception as e:
+        raise ValueError(f"Cannot open document: {e}")
+    return getattr(image, "n_frames", 1), _iter_image_frames(image, max_pixels=max_pixels)
+
+
+def _check_size(width: float, height: float, max_pixels: int):
+    if max_pixels and width * height > max_pixels:
+        raise ImageTooLarge(f"Page is {int(width)}x{int(height)}, limit is {max_pixels / 1e6:.1f} MP")
+
+
+def _render_pdf_page(pdf, index: int, scale: float, max_pixels: int) -> np.ndarray:
+    with _PDFIUM_LOCK:
+        page = pdf[index]
+        try:
+            width, height = page.get_size()
+            _check_size(width * scale, height * scale, max_pixels)
+            bitmap = page.render(scale=scale)
+            try:
+                # Copy out of the PDFium buffer before the bitmap is freed
+                return to_rgb_array(bitmap.to_pil())
+            finally:
+                bitmap.close()
+        finally:
+            page.close()
+
+
+def _iter_pdf_pages(pdf, page_count: int, scale: float, max_pixels: int = 0) -> Iterator[np.ndarray]:
+    try:
+        for index in range(page_count):
+            yield _render_pdf_page(pdf, index, scale, max_pixels)
+    finally:
+        with _PDFIUM_LOCK:
+            pdf.close()
+
+
+def _iter_image_frames(image: Image.Image, max_pixels: int = 0) -> Iterator[np.ndarray]:
+    try:
+        for frame in ImageSequence.Iterator(image):
+            _check_size(*frame.size, max_pixels)
+            yield to_rgb_array(frame)
+    finally:
+        image.close()
@@ -0,0 +1,144 @@
+"""
+Response encoding for OCR results: field selection, a compact packed-array format and gzip/zstd.
+The plain JSON shape stays the default; the compact format is opt-in.
+"""
+
+import base64
+import gzip
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPACT_MEDIA_TYPE = "application/vnd.ocr.compact+json"
+RESPONSE_FORMATS = ("json", "compact")
+RESULT_FIELDS = ("rec_texts", "rec_boxes", "rec_scores", "dt_polys", "image_dims")
+
+# Fields packed as little-endian arrays in the compact format
+PACKED_DTYPES = {
+    "rec_boxes": "<i4",
+    "rec_scores": "<f4",
+    "dt_polys": "<i4",
+}
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+
+def parse_fields(fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """
+    Validate a field selection; None means all fields.
+
+    Raises:
+        ValueError: for an unknown field name
+    """
+    if not fields:
+        return None
+    unknown = [field for field in fields if field not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}. Available: {list(RESULT_FIELDS)}")
+    return list(fields)
+
+
+def negotiate_format(requested: Optional[str], accept: str = "") -> str:
+    """
+    Pick the response format from an explicit request or the Accept header.
+
+    Raises:
+        ValueError: for an unknown format name
+    """
+    if requested:
+        if requested not in RESPONSE_FORMATS:
+            raise ValueError(f"response_format must be one of {list(RESPONSE_FORMATS)}")
+        return requested
+    return "compact" if COMPACT_MEDIA_TYPE in accept else "json"
+
+
+def select_fields(results: List[Dict], fields: Optional[List[str]]) -> List[Dict]:
+    """Keep only the requested keys of each result entry."""
+    if fields is None:
+        return results
+    return [{key: value for key, value in entry.items() if key in fields} for entry in results]
+
+
+def pack_array(values, dtype: str):
+    """
+    Pack a (nested) list of numbers as {"dtype", "shape", "data"} with base64 raw bytes.
+    Ragged inputs (e.g. polygons with different point counts) are returned unchanged.
+    """
+    try:
+        array = np.asarray(values, dtype=dtype)
+    except ValueError:
+        return values
+    return {
+        "dtype": dtype,
+        "shape": list(array.shape),
+        "data": base64.b64encode(array.tobytes()).decode("ascii")
+    }
+
+
+def to_compact(results: List[Dict]) -> List[Dict]:
+    """Replace the numeric list fields with packed arrays."""
+    compact = []
+    for entry in results:
+        packed = dict(entry)
+        for key, dtype in PACKED_DTYPES.items():
+            if key in packed:
+                packed[key] = pack_array(packed[key], dtype)
+        compact.append(packed)
+    return compact
+
+
+def compress(body: bytes, accept_encoding: str = "") -> Tuple[bytes, Optional[str]]:
+    """Compress with zstd (if installed) or gzip when the client accepts it."""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(name.strip().lower())
+
+    if "zstd" in accepted and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(body), "zstd"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
+
+
+def encode_results(results: List[Dict],
+                   response_format: str = "json",
+                   fields: Optional[List[str]] = None,
+                   accept_encoding: str = "") -> Tuple[bytes, str, Dict[str, str]]:
+    """
+    Build the OCRResponse body.
+
+    Returns:
+        Tuple of (body bytes, media type, extra headers)
+    """
+    results = select_fields(results, fields)
+    if response_format == "compact":
+        results = to_compact(results)
+        media_type = COMPACT_MEDIA_TYPE
+    else:
+        media_type = "application/json"
+
+    body = json.dumps({"results": results, "status": "success"}).encode("utf-8")
+    body, content_encoding = compress(body, accept_encoding)
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return body, media_type, headers
@@ -0,0 +1,83 @@
+"""
+Bounded worker pool for the blocking part of OCR requests.
+Keeps decode and inference off the event loop and rejects work once the queue is full.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class Saturated(Exception):
+    """Raised when the worker pool and its queue are both full."""
+
+
+class BoundedExecutor:
+    """Thread pool that accepts at most max_workers + max_queue jobs at a time."""
+
+    def __init__(self, max_workers: int = 16, max_queue: int = 32):
+        """
+        Create the worker pool.
+
+        Args:
+            max_workers: Number of threads running jobs concurrently
+            max_queue: Number of accepted jobs allowed to wait for a free thread
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr-worker")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Schedule fn on the pool.
+
+        Raises:
+            Saturated: if max_workers + max_queue jobs are already accepted
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise Saturated(
+                    f"Inference queue is full ({self._pending} requests pending)"
+                )
+            self._pending += 1
+
+        try:
+            return self._pool.submit(self._run, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._pending -= 1
+                self._completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and in-flight count for load balancers and dashboards."""
+        with self._lock:
+            return {
+                "queue_depth": self._pending - self._in_flight,
+                "in_flight": self._in_flight,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        """Wait for accepted jobs and stop the threads."""
+        self._pool.shutdown(wait=True)
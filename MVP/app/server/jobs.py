@@ -0,0 +1,261 @@
+"""
+Asynchronous bulk OCR jobs backed by a local SQLite store.
+Submissions return a job id at once; worker threads drain pending pages independently of clients.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class JobStore:
+    """SQLite persistence for jobs and their pages."""
+
+    def __init__(self, path: str, ttl_seconds: float = 24 * 3600):
+        """
+        Open (or create) the job database.
+
+        Args:
+            path: SQLite file holding jobs, pending images and results
+            ttl_seconds: Finished jobs and their results are deleted this long after their last page
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " model_name TEXT NOT NULL,"
+            " options TEXT NOT NULL,"
+            " page_count INTEGER NOT NULL,"
+            " created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " job_id TEXT NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " image BLOB,"
+            " result TEXT,"
+            " error TEXT,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (job_id, idx));"
+            "CREATE INDEX IF NOT EXISTS pages_status ON pages (status);"
+        )
+        # Pages that were running when the server stopped go back to the queue
+        self._db.execute("UPDATE pages SET status = 'pending' WHERE status = 'running'")
+        self._db.commit()
+
+    def create(self, images: List[bytes], model_name: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Persist a new job with one pending page per image and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, model_name, options, page_count, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, model_name, json.dumps(options or {}), len(images), now)
+            )
+            self._db.executemany(
+                "INSERT INTO pages (job_id, idx, status, image, updated_at) VALUES (?, ?, 'pending', ?, ?)",
+                [(job_id, idx, image, now) for idx, image in enumerate(images)]
+            )
+            self._db.commit()
+        return job_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest pending page, or None if the queue is empty."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT p.job_id, p.idx, p.image, j.model_name, j.options"
+                " FROM pages p JOIN jobs j ON j.id = p.job_id"
+                " WHERE p.status = 'pending' ORDER BY j.created_at, p.idx LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE pages SET status = 'running', updated_at = ? WHERE job_id = ? AND idx = ?",
+                (time.time(), row[0], row[1])
+            )
+            self._db.commit()
+        return {
+            "job_id": row[0],
+            "page": row[1],
+            "image": row[2],
+            "model_name": row[3],
+            "options": json.loads(row[4]),
+        }
+
+    def finish(self, job_id: str, page: int, result: Any = None, error: Optional[str] = None):
+        """Store a page's result (or error) and drop its image."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET status = ?, result = ?, error = ?, image = NULL, updated_at = ?"
+                " WHERE job_id = ? AND idx = ?",
+                (
+                    "failed" if error is not None else "done",
+                    None if error is not None else json.dumps(result),
+                    error,
+                    time.time(),
+                    job_id,
+                    page
+                )
+            )
+            self._db.commit()
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs whose last page ended more than ttl_seconds ago; returns how many."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [(job_id,) for job_id, in self._db.execute(
+                "SELECT job_id FROM pages GROUP BY job_id"
+                " HAVING SUM(status IN ('pending', 'running')) = 0 AND MAX(updated_at) < ?",
+                (cutoff,)
+            ).fetchall()]
+            if expired:
+                self._db.executemany("DELETE FROM pages WHERE job_id = ?", expired)
+                self._db.executemany("DELETE FROM jobs WHERE id = ?", expired)
+                self._db.commit()
+        return len(expired)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM pages WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job summary with per-status page counts, or None for an unknown id."""
+        with self._lock:
+            job = self._db.execute(
+                "SELECT model_name, page_count, created_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM pages WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            updated_at = self._db.execute(
+                "SELECT MAX(updated_at) FROM pages WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+
+        model_name, page_count, created_at = job
+        done, failed = counts.get("done", 0), counts.get("failed", 0)
+        if done + failed == page_count:
+            status = "completed"
+        elif done + failed + counts.get("running", 0) == 0:
+            status = "queued"
+        else:
+            status = "running"
+
+        return {
+            "job_id": job_id,
+            "status": status,
+            "model_name": model_name,
+            "page_count": page_count,
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+            "done": done,
+            "failed": failed,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def iter_results(self, job_id: str, chunk_size: int = 50) -> Iterator[Dict[str, Any]]:
+        """Yield finished pages in page order, reading chunk_size rows at a time."""
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT idx, status, result, error FROM pages"
+                    " WHERE job_id = ? AND idx > ? AND status IN ('done', 'failed')"
+                    " ORDER BY idx LIMIT ?",
+                    (job_id, last, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            for idx, status, result, error in rows:
+                if status == "done":
+                    yield {"page": idx, "status": status, "result": json.loads(result)}
+                else:
+                    yield {"page": idx, "status": status, "error": error}
+            last = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JobWorkers:
+    """Threads that drain pending job pages through process_fn."""
+
+    def __init__(self,
+                 store: JobStore,
+                 process_fn: Callable[[bytes, str, Dict[str, Any]], Any],
+                 num_workers: int = 8,
+                 poll_interval: float = 1.0,
+                 purge_interval: float = 600.0):
+        """
+        Start the workers.
+
+        Args:
+            store: Job store to drain
+            process_fn: Callable taking (image bytes, model name, job options) and returning the page result
+            num_workers: Concurrent pages; keep it at least the batch size so model calls stay full
+            poll_interval: Seconds between queue checks when idle
+            purge_interval: Seconds between deletions of expired jobs (done by an idle worker)
+        """
+        self.store = store
+        self.process_fn = process_fn
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+
+        self._purge_lock = threading.Lock()
+        self._last_purge = 0.0
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"ocr-job-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def notify(self):
+        """Wake idle workers after new pages were queued."""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            task = self.store.claim()
+            if task is None:
+                self._purge()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            try:
+                result = self.process_fn(task["image"], task["model_name"], task["options"])
+            except Exception as e:
+                self.store.finish(task["job_id"], task["page"], error=str(e))
+            else:
+                self.store.finish(task["job_id"], task["page"], result=result)
+
+    def _purge(self):
+        with self._purge_lock:
+            if time.monotonic() - self._last_purge < self.purge_interval:
+                return
+            self._last_purge = time.monotonic()
+        try:
+            self.store.purge_expired()
+        except sqlite3.Error as e:
+            print(f"✗ Purging expired jobs failed: {e}")
+
+    def stop(self):
+        """Stop after the pages currently being processed are finished."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,66 @@
+"""
+Server-side key information extraction (KIE): runs the client's filter_text pipeline right after
+inference so that only the extracted country / weight / item fields go back over the network.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_filter_text = None
+
+
+def import_mvp(module: str, mvp_root: Optional[str] = None):
+    """
+    Import a module of the MVP package, e.g. "MVP.config".
+
+    The server is usually deployed as a flat directory, so when the MVP package is not importable
+    the repository root (mvp_root, or three levels above this file) is added to sys.path.
+
+    Raises:
+        ImportError: if the MVP package cannot be found
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        if mvp_root is None:
+            parents = Path(__file__).resolve().parents
+            mvp_root = str(parents[3]) if len(parents) > 3 else None
+        if mvp_root and mvp_root not in sys.path:
+            sys.path.insert(0, mvp_root)
+        return importlib.import_module(module)
+
+
+def load_filter_text(mvp_root: Optional[str] = None):
+    """
+    Import MVP.utils.filtering.filter_text on first use (see import_mvp).
+
+    Raises:
+        ImportError: if the MVP package cannot be found
+    """
+    global _filter_text
+    if _filter_text is None:
+        _filter_text = import_mvp("MVP.utils.filtering", mvp_root).filter_text
+    return _filter_text
+
+
+def extract_fields(results: List[Dict[str, Any]],
+                   include_texts: bool = False,
+                   mvp_root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Apply filter_text to each OCR result entry.
+
+    Args:
+        results: Entries as produced by format_result (rec_texts, rec_boxes, rec_scores, image_dims)
+        include_texts: Also return the matched texts and their scores per field
+        mvp_root: Directory containing the MVP package, if it is not importable already
+
+    Returns:
+        One {"country", "weight", "item"[, "texts"]} dict per entry
+    """
+    filter_text = load_filter_text(mvp_root)
+    return [
+        filter_text(entry, image_dims=tuple(entry["image_dims"][:2]), include_texts=include_texts)
+        for entry in results
+    ]
@@ -0,0 +1,135 @@
+"""
+Image preprocessing before detection: decoding, color-mode normalization and downsizing of oversized scans.
+Boxes predicted on the downsized image are mapped back to original coordinates afterwards.
+"""
+
+from io import BytesIO
+from typing import Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+# 8-bit modes without alpha that cv2.imdecode turns into the same RGB pixels as PIL
+FAST_DECODE_MODES = {"1", "L", "P", "RGB", "YCbCr", "CMYK"}
+
+
+class ImageTooLarge(ValueError):
+    """Raised when an image header declares more pixels than allowed (decompression bomb guard)."""
+
+
+def decode_image_bytes(data: Union[bytes, memoryview], max_pixels: int = 0) -> np.ndarray:
+    """
+    Decode raw image bytes to a C-contiguous RGB uint8 array of shape (H, W, 3).
+
+    Common 8-bit images go through cv2.imdecode on a zero-copy view of the buffer and are
+    converted BGR -> RGB in place; EXIF orientation is applied by the decoder. Alpha, 16-bit
+    and formats OpenCV cannot read fall back to PIL (see to_rgb_array).
+
+    Args:
+        data: Encoded image (bytes, bytearray or memoryview)
+        max_pixels: Reject images whose header declares more pixels than this (0 disables)
+
+    Raises:
+        ImageTooLarge: if the image exceeds max_pixels
+    """
+    # Header only; PIL does not decode pixels until asked to
+    image = Image.open(BytesIO(data))
+    width, height = image.size
+    if max_pixels and width * height > max_pixels:
+        raise ImageTooLarge(
+            f"Image is {width}x{height} ({width * height:,} pixels), limit is {max_pixels:,} pixels"
+        )
+
+    fast = image.mode in FAST_DECODE_MODES and not (image.mode == "P" and "transparency" in image.info)
+    if fast:
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        if image.mode in ("1", "L"):
+            # Decoding grayscale as one channel and expanding once is cheaper than a 3-channel decode
+            decoded = cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+            if decoded is not None:
+                image.close()
+                return cv2.cvtColor(decoded, cv2.COLOR_GRAY2RGB)
+        else:
+            decoded = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+            if decoded is not None:
+                image.close()
+                return cv2.cvtColor(decoded, cv2.COLOR_BGR2RGB, dst=decoded)
+
+    image = ImageOps.exif_transpose(image)
+    return np.ascontiguousarray(to_rgb_array(image))
+
+
+def to_rgb_array(image: Image.Image) -> np.ndarray:
+    """
+    Convert any PIL image mode to an RGB uint8 array.
+
+    Handles grayscale, palette, alpha (composited onto white, like a paper scan)
+    and 16-bit / 32-bit / float images (rescaled to the 8-bit range).
+    """
+    mode = image.mode
+
+    if mode.startswith("I") or mode == "F":
+        # High bit-depth grayscale: stretch to 0-255 instead of clipping
+        array = np.asarray(image, dtype=np.float32)
+        low, high = float(array.min()), float(array.max())
+        if high > low:
+            array = (array - low) * (255.0 / (high - low))
+        else:
+            array = np.zeros_like(array)
+        gray = np.ascontiguousarray(array.astype(np.uint8))
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+
+    if mode == "P" and "transparency" in image.info:
+        image = image.convert("RGBA")
+        mode = "RGBA"
+
+    if mode in ("RGBA", "LA", "PA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image.convert("RGBA"), mask=image.getchannel("A"))
+        image = background
+    elif mode != "RGB":
+        image = image.convert("RGB")
+
+    return np.asarray(image)
+
+
+def downscale(image: np.ndarray, max_side: int = 0, max_megapixels: float = 0) -> Tuple[np.ndarray, float]:
+    """
+    Shrink an image so it fits within max_side and max_megapixels (0 disables a limit).
+
+    Returns:
+        Tuple of (possibly resized image, scale factor applied; 1.0 when unchanged)
+    """
+    height, width = image.shape[:2]
+    scale = 1.0
+
+    if max_side and max(height, width) > max_side:
+        scale = min(scale, max_side / max(height, width))
+    if max_megapixels and height * width > max_megapixels * 1e6:
+        scale = min(scale, (max_megapixels * 1e6 / (height * width)) ** 0.5)
+
+    if scale >= 1.0:
+        return image, 1.0
+
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    resized = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    # Use the effective scale so the mapping back is exact on both axes
+    return resized, size[0] / width
+
+
+def to_original_coords(points, scale: float) -> np.ndarray:
+    """Map boxes or polygons predicted on a downscaled image back to the original image."""
+    points = np.asarray(points)
+    if scale == 1.0:
+        return points
+    return np.rint(points / scale).astype(np.int32)
+
+
+def make_warmup_page(height: int = 1000, width: int = 800) -> np.ndarray:
+    """Synthetic white page with a few lines of text, used to warm up the models."""
+    page = np.full((height, width, 3), 255, dtype=np.uint8)
+    lines = ["CERTIFICATE OF ORIGIN", "Country of origin: TURKEY", "Gross weight 850,00 KG"]
+    for i, text in enumerate(lines):
+        cv2.putText(page, text, (60, 120 + 90 * i), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    return page
@@ -0,0 +1,159 @@
+"""
+Registry of OCR pipelines selectable through OCRRequest.model_name.
+Models are loaded on first use and the least recently used one is evicted when too many are resident.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+def load_paddle_pipeline(pipeline: str, params: Dict[str, Any]):
+    """Build a paddleocr pipeline (e.g. PaddleOCR, PPStructureV3) by class name."""
+    import paddleocr
+
+    return getattr(paddleocr, pipeline)(**params)
+
+
+class ModelRegistry:
+    """
+    Lazily loads named pipelines and keeps at most max_loaded of them resident.
+
+    The limit counts models, not bytes: size it for the largest pipelines that may be loaded
+    together. A model pinned by an in-flight request is never evicted, so the limit can be
+    exceeded until its last pin is released.
+    """
+
+    def __init__(self,
+                 configs: Dict[str, Dict[str, Any]],
+                 default: str,
+                 max_loaded: int = 2,
+                 aliases: Optional[Dict[str, str]] = None,
+                 loader: Callable[[str, Dict[str, Any]], Any] = load_paddle_pipeline):
+        """
+        Args:
+            configs: Model name -> {"pipeline": paddleocr class name, "params": constructor kwargs}
+            default: Model served for the "default" name
+            max_loaded: Number of unpinned models kept resident at the same time
+            aliases: Extra names mapping to entries of configs
+            loader: Callable building a model from (pipeline, params)
+        """
+        self.configs = configs
+        self.default = default
+        self.max_loaded = max(1, max_loaded)
+        self.aliases = {"default": default, **(aliases or {})}
+        self.loader = loader
+
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in configs}
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._info: Dict[str, Dict[str, float]] = {}
+        self._pins: Dict[str, int] = {}
+
+    def resolve(self, name: str) -> str:
+        """
+        Map a requested name to a configured model name.
+
+        Raises:
+            KeyError: if the name is unknown
+        """
+        name = self.aliases.get(name, name)
+        if name not in self.configs:
+            raise KeyError(
+                f"Unknown model '{name}'. Available: {sorted(self.configs) + sorted(self.aliases)}"
+            )
+        return name
+
+    def config(self, name: str) -> Dict[str, Any]:
+        """Pipeline configuration of a model, e.g. for cache keys."""
+        name = self.resolve(name)
+        return {"model": name, **self.configs[name]}
+
+    def get(self, name: str, pin: bool = False):
+        """
+        Return the loaded model, loading it (and evicting the LRU one) if needed.
+        With pin=True the model stays resident until release(name) is called.
+        """
+        name = self.resolve(name)
+        with self._lock:
+            model = self._touch(name, pin)
+        if model is not None:
+            return model
+
+        # Only one thread loads a given model; others wait for it
+        with self._load_locks[name]:
+            with self._lock:
+                model = self._touch(name, pin)
+            if model is not None:
+                return model
+
+            spec = self.configs[name]
+            print(f"Loading model '{name}' ({spec['pipeline']})...")
+            started = time.perf_counter()
+            model = self.loader(spec["pipeline"], spec.get("params", {}))
+            load_time = time.perf_counter() - started
+            print(f"Model '{name}' loaded in {load_time:.1f}s")
+
+            with self._lock:
+                self._models[name] = model
+                self._info[name] = {
+                    "load_time_s": load_time,
+                    "loaded_at": time.time(),
+                    "last_used": time.time(),
+                }
+                if pin:
+                    self._pins[name] = self._pins.get(name, 0) + 1
+                self._evict(keep=name)
+            return model
+
+    def release(self, name: str):
+        """Drop a pin taken with get(name, pin=True); evicts models that were kept only by pins."""
+        name = self.resolve(name)
+        with self._lock:
+            self._pins[name] -= 1
+            if not self._pins[name]:
+                del self._pins[name]
+            self._evict()
+
+    @contextmanager
+    def pinned(self, name: str) -> Iterator[Any]:
+        """Load a model and keep it resident for the duration of the block, e.g. while a batch is in flight."""
+        model = self.get(name, pin=True)
+        try:
+            yield model
+        finally:
+            self.release(name)
+
+    def _evict(self, keep: Optional[str] = None):
+        """Evict least recently used unpinned models while more than max_loaded are resident."""
+        while len(self._models) > self.max_loaded:
+            evicted = next(
+                (name for name in self._models if name != keep and not self._pins.get(name)), None
+            )
+            if evicted is None:
+                return
+            del self._models[evicted]
+            self._info.pop(evicted, None)
+            print(f"Evicted model '{evicted}'")
+
+    def _touch(self, name, pin=False):
+        model = self._models.get(name)
+        if model is not None:
+            self._models.move_to_end(name)
+            self._info[name]["last_used"] = time.time()
+            if pin:
+                self._pins[name] = self._pins.get(name, 0) + 1
+        return model
+
+    def status(self) -> Dict[str, Any]:
+        """Loaded models with their load times, for /health."""
+        with self._lock:
+            return {
+                "default": self.default,
+                "available": sorted(self.configs),
+                "max_loaded": self.max_loaded,
+                "loaded": {name: dict(self._info[name]) for name in self._models},
+                "pinned": dict(self._pins),
+            }
@@ -0,0 +1,118 @@
+"""
+Region-of-interest OCR: crop the regions a template cares about and run OCR only on those.
+Results from the crops are merged back into one full-page result.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from kie import import_mvp
+
+# Normalized [x, y, width, height] regions per document template, loaded on first use
+_templates = None
+
+
+def load_templates(mvp_root: Optional[str] = None) -> Dict[str, Dict[str, List[float]]]:
+    """
+    ROI templates. "coo" is CATEGORY_TO_BBOX from MVP/config, the same regions filter_text uses,
+    so the crops always cover the fields the client extracts. Without the MVP package there are
+    no templates (explicit regions still work).
+    """
+    global _templates
+    if _templates is None:
+        try:
+            config = import_mvp("MVP.config", mvp_root)
+        except ImportError as e:
+            print(f"⚠ ROI templates unavailable, set OCR_MVP_ROOT: {e}")
+            _templates = {}
+        else:
+            _templates = {"coo": {name: list(box) for name, box in config.CATEGORY_TO_BBOX.items()}}
+    return _templates
+
+
+def resolve_regions(template: Optional[str],
+                    regions: Optional[Dict[str, Sequence[float]]],
+                    mvp_root: Optional[str] = None) -> Optional[Dict[str, List[float]]]:
+    """
+    Pick the regions to OCR from a template name and/or explicit regions.
+
+    Raises:
+        ValueError: for an unknown template or a malformed region
+    """
+    if template is None and not regions:
+        return None
+
+    resolved = {}
+    if template is not None:
+        templates = load_templates(mvp_root)
+        if template not in templates:
+            raise ValueError(f"Unknown template '{template}'. Available: {sorted(templates)}")
+        resolved.update(templates[template])
+
+    for name, box in (regions or {}).items():
+        if len(box) != 4:
+            raise ValueError(f"Region '{name}' must be [x, y, width, height], got {box}")
+        x, y, w, h = box
+        if not (0 <= x <= 1 and 0 <= y <= 1 and 0 < w <= 1 and 0 < h <= 1):
+            raise ValueError(f"Region '{name}' must be normalized to [0, 1], got {box}")
+        resolved[name] = [float(v) for v in box]
+    return resolved
+
+
+def pixel_rects(regions: Dict[str, Sequence[float]],
+                image_shape: Tuple[int, ...],
+                padding: float = 0.02) -> List[List[int]]:
+    """
+    Convert normalized regions to padded pixel rectangles [x1, y1, x2, y2].
+    Overlapping rectangles are merged so no text is recognized twice. Every rectangle lies
+    inside the page and is at least 1 px wide and high, so no crop is empty.
+    """
+    height, width = image_shape[:2]
+    rects = []
+    for x, y, w, h in regions.values():
+        x1 = min(max(0, int((x - padding) * width)), width - 1)
+        y1 = min(max(0, int((y - padding) * height)), height - 1)
+        rects.append([
+            x1,
+            y1,
+            max(x1 + 1, min(width, int(np.ceil((x + w + padding) * width)))),
+            max(y1 + 1, min(height, int(np.ceil((y + h + padding) * height)))),
+        ])
+
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rects[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
+
+
+def merge_entries(entries: List[Dict], rects: List[List[int]], image_shape) -> Dict:
+    """
+    Merge per-crop response entries into one entry in full-page coordinates.
+
+    Args:
+        entries: Response entries (as built by format_result) for each crop
+        rects: Pixel rectangle each crop was cut from
+        image_shape: Shape of the full page
+    """
+    merged = {"rec_texts": [], "rec_boxes": [], "rec_scores": [], "dt_polys": []}
+    for entry, (x1, y1, _, _) in zip(entries, rects):
+        boxes = np.asarray(entry["rec_boxes"], dtype=np.int64).reshape(-1, 4)
+        merged["rec_texts"].extend(entry["rec_texts"])
+        merged["rec_scores"].extend(entry["rec_scores"])
+        merged["rec_boxes"].extend((boxes + [x1, y1, x1, y1]).tolist())
+        merged["dt_polys"].extend((np.asarray(poly) + [x1, y1]).tolist() for poly in entry["dt_polys"])
+
+    merged["image_dims"] = image_shape
+    merged["regions"] = rects
+    return merged
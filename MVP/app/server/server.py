@@ -1,14 +1,110 @@
 # server.py (runs on VM)
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response, PlainTextResponse, JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from paddleocr import PaddleOCR
+from PIL import UnidentifiedImageError
+from typing import Dict, List, Optional
 import uvicorn
 import base64
+import binascii
 import numpy as np
-from io import BytesIO
-from PIL import Image
-import cv2
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from batching import MicroBatcher
+from executor import BoundedExecutor, Saturated
+from cache import ResultCache
+from registry import ModelRegistry, load_paddle_pipeline
+from documents import open_document
+from preprocess import decode_image_bytes, downscale, to_original_coords, make_warmup_page, ImageTooLarge
+from roi import resolve_regions, pixel_rects, merge_entries
+from metrics import MetricsRegistry
+from encoding import encode_results, negotiate_format, parse_fields
+from jobs import JobStore, JobWorkers
+from kie import extract_fields
+
+# Micro-batching window: requests arriving within MAX_WAIT_MS of the first one
+# are sent to the model together, up to MAX_BATCH_SIZE images per predict call.
+MAX_BATCH_SIZE = int(os.environ.get("OCR_MAX_BATCH_SIZE", 8))
+MAX_WAIT_MS = float(os.environ.get("OCR_MAX_WAIT_MS", 10))
+
+# Worker pool for decode + inference. Each worker holds one request while it
+# waits for its batch, so keep enough workers to fill a batch. Requests beyond
+# MAX_WORKERS + MAX_QUEUE are rejected with 503 and a Retry-After header.
+MAX_WORKERS = int(os.environ.get("OCR_MAX_WORKERS", 2 * MAX_BATCH_SIZE))
+MAX_QUEUE = int(os.environ.get("OCR_MAX_QUEUE", 32))
+RETRY_AFTER_SECONDS = 1
+
+# Content-addressed result cache: in-memory LRU backed by a SQLite file
+CACHE_PATH = os.environ.get(
+    "OCR_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_cache.sqlite3")
+)
+CACHE_MAX_MEMORY_ENTRIES = int(os.environ.get("OCR_CACHE_MAX_MEMORY_ENTRIES", 256))
+CACHE_MAX_DISK_ENTRIES = int(os.environ.get("OCR_CACHE_MAX_DISK_ENTRIES", 10000))
+CACHE_TTL_SECONDS = float(os.environ.get("OCR_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+MODEL_CONFIG = {
+    "use_doc_orientation_classify": False,
+    "use_doc_unwarping": False,
+    "use_textline_orientation": False
+}
+
+# Pipelines selectable through OCRRequest.model_name. Each is loaded the first
+# time it is requested; at most MAX_LOADED_MODELS stay resident (LRU eviction).
+MODEL_CONFIGS = {
+    "PaddleOCR": {"pipeline": "PaddleOCR", "params": MODEL_CONFIG},
+    "PaddleStructure": {"pipeline": "PPStructureV3", "params": MODEL_CONFIG},
+}
+DEFAULT_MODEL = "PaddleOCR"
+MAX_LOADED_MODELS = int(os.environ.get("OCR_MAX_LOADED_MODELS", 2))
+
+# Inference backend: "paddle" (default) or "stub", which replays recorded
+# results after a simulated delay so the server runs without PaddleOCR / GPU
+BACKEND = os.environ.get("OCR_BACKEND", "paddle")
+STUB_RECORDING_PATH = os.environ.get("OCR_STUB_RECORDING")
+STUB_DELAY_MS = float(os.environ.get("OCR_STUB_DELAY_MS", 200))
+STUB_PER_IMAGE_MS = float(os.environ.get("OCR_STUB_PER_IMAGE_MS", 20))
+
+# Models loaded and warmed up in the background at startup; /ready turns
+# green once they all answered a synthetic page
+PRELOAD_MODELS = [
+    name for name in os.environ.get("OCR_PRELOAD_MODELS", DEFAULT_MODEL).split(",") if name
+][:MAX_LOADED_MODELS]
+
+# Multi-page documents: PDF rendering resolution, and how many pages may be
+# rasterized / in inference at once (bounds peak memory per document)
+PDF_DPI = int(os.environ.get("OCR_PDF_DPI", 200))
+DOCUMENT_PAGE_WINDOW = int(os.environ.get("OCR_DOCUMENT_PAGE_WINDOW", 2))
+
+# Oversized scans are shrunk before detection (0 disables a limit). Boxes are
+# mapped back, so responses are always in original-image coordinates.
+PREPROCESS_CONFIG = {
+    "max_side": int(os.environ.get("OCR_MAX_IMAGE_SIDE", 3500)),
+    "max_megapixels": float(os.environ.get("OCR_MAX_MEGAPIXELS", 10)),
+}
+
+# Decompression-bomb guard: images declaring more pixels than this are rejected with 413
+MAX_IMAGE_PIXELS = int(float(os.environ.get("OCR_MAX_IMAGE_PIXELS", 120e6)))
+
+# ROI mode: padding around each requested region, as a fraction of the page size
+ROI_PADDING = float(os.environ.get("OCR_ROI_PADDING", 0.02))
+
+# Asynchronous bulk jobs: local SQLite store, drained by JOB_WORKERS threads
+# that feed the same batcher as interactive requests
+JOBS_PATH = os.environ.get(
+    "OCR_JOBS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_jobs.sqlite3")
+)
+JOB_WORKERS = int(os.environ.get("OCR_JOB_WORKERS", MAX_BATCH_SIZE))
+JOB_TTL_SECONDS = float(os.environ.get("OCR_JOB_TTL_SECONDS", 24 * 3600))
+
+# KIE mode (extract=true) imports MVP.utils.filtering; set this when the MVP
+# package is not importable from the server directory
+MVP_ROOT = os.environ.get("OCR_MVP_ROOT")
 
 app = FastAPI()
 
@@ -20,66 +116,570 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load model ONCE at startup with your specific configuration
-print("Loading PaddleOCR model...")
-ocr = PaddleOCR(
-    use_doc_orientation_classify=False,
-    use_doc_unwarping=False,
-    use_textline_orientation=False
+metrics = MetricsRegistry()
+REQUESTS = metrics.counter(
+    "ocr_http_requests_total", "HTTP requests by route and status code", labels=("path", "status")
+)
+REQUEST_SECONDS = metrics.histogram(
+    "ocr_http_request_seconds", "HTTP request latency until the response starts", labels=("path",)
+)
+STAGE_SECONDS = metrics.histogram(
+    "ocr_stage_seconds",
+    "Latency per pipeline stage: decode (base64), image_decode, preprocess, predict (per batch), "
+    "format, serialize, warmup",
+    labels=("stage",)
+)
+PAYLOAD_BYTES = metrics.histogram(
+    "ocr_payload_bytes", "Size of the decoded image payload",
+    buckets=(1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7, 5e7)
+)
+IMAGE_MEGAPIXELS = metrics.histogram(
+    "ocr_image_megapixels", "Size of the decoded image before preprocessing",
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 12, 16, 25, 50)
+)
+BATCH_SIZE = metrics.histogram(
+    "ocr_batch_size", "Images per model predict call", labels=("model",),
+    buckets=tuple(range(1, MAX_BATCH_SIZE + 1))
 )
-print("Model loaded and ready!")
+
+if BACKEND == "stub":
+    from stub_backend import make_stub_loader
+    model_loader = make_stub_loader(STUB_RECORDING_PATH, delay_ms=STUB_DELAY_MS, per_image_ms=STUB_PER_IMAGE_MS)
+elif BACKEND == "paddle":
+    model_loader = load_paddle_pipeline
+else:
+    raise ValueError(f"OCR_BACKEND must be 'paddle' or 'stub', got '{BACKEND}'")
+
+registry = ModelRegistry(
+    MODEL_CONFIGS, default=DEFAULT_MODEL, max_loaded=MAX_LOADED_MODELS, loader=model_loader
+)
+
+def predict_batch(model_name, images):
+    """
+    Run one model call for a batch of images (called by the batcher thread).
+    Callers load and pin the model with registry.pinned before submitting, so a slow first
+    load never holds up batches for the other models here, and the model cannot be evicted
+    (and silently reloaded here) while its batch is queued.
+    """
+    model = registry.get(model_name)
+    BATCH_SIZE.observe(len(images), model=model_name)
+    with STAGE_SECONDS.time(stage="predict"):
+        return model.predict(input=images)
+
+batcher = MicroBatcher(
+    predict_fn=predict_batch,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_WAIT_MS
+)
+executor = BoundedExecutor(max_workers=MAX_WORKERS, max_queue=MAX_QUEUE)
+cache = ResultCache(
+    CACHE_PATH,
+    max_memory_entries=CACHE_MAX_MEMORY_ENTRIES,
+    max_disk_entries=CACHE_MAX_DISK_ENTRIES,
+    ttl_seconds=CACHE_TTL_SECONDS
+)
+
+job_store = JobStore(JOBS_PATH, ttl_seconds=JOB_TTL_SECONDS)
+job_workers = JobWorkers(
+    job_store,
+    process_fn=lambda image_bytes, model_name, options: run_ocr(image_bytes, model_name, **options)[0],
+    num_workers=JOB_WORKERS
+)
+
+metrics.gauge(
+    "ocr_model_load_seconds", "Load time of the currently resident models", ("model",),
+    lambda: [((name,), info["load_time_s"]) for name, info in registry.status()["loaded"].items()]
+)
+metrics.gauge(
+    "ocr_queue_depth", "Requests waiting for a worker (executor) or for a model call (batcher)", ("queue",),
+    lambda: [(("executor",), executor.stats()["queue_depth"]), (("batcher",), batcher.stats()["queue_depth"])]
+)
+metrics.gauge(
+    "ocr_in_flight", "Requests currently held by a worker", (),
+    lambda: [((), executor.stats()["in_flight"])]
+)
+
+# Readiness of the preloaded models: starting -> ready | failed
+readiness = {"status": "starting", "detail": None, "since": time.time()}
+
+def load_and_warm_up():
+    """Load PRELOAD_MODELS and run one warmup inference each (runs on a background thread)"""
+    try:
+        page = make_warmup_page()
+        for name in PRELOAD_MODELS:
+            with registry.pinned(name):
+                print(f"Warming up model '{name}'...")
+                with STAGE_SECONDS.time(stage="warmup"):
+                    batcher.submit(page, key=registry.resolve(name)).result()
+        readiness.update(status="ready", since=time.time())
+        print("Models loaded and ready!")
+    except Exception as e:
+        readiness.update(status="failed", detail=str(e), since=time.time())
+        print(f"Model loading failed: {e}")
+
+@app.on_event("startup")
+def start_model_loading():
+    # The HTTP server comes up immediately; models load in the background
+    threading.Thread(target=load_and_warm_up, name="model-loader", daemon=True).start()
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        # Lets clients tell server time from network time
+        response.headers["Server-Timing"] = f"app;dur={1000 * (time.perf_counter() - started):.1f}"
+        return response
+    finally:
+        # Label by route template (e.g. /jobs/{job_id}) to keep cardinality bounded
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUESTS.inc(path=path, status=status)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, path=path)
 
 # Define request schema
 class OCRRequest(BaseModel):
     image: str  # base64 encoded image
-    model_name: str = "default"  # for future model selection
+    model_name: str = "default"  # one of MODEL_CONFIGS, or "default"
+    use_cache: bool = True  # False skips the cache lookup and refreshes the entry
+    template: Optional[str] = None  # ROI mode: OCR only the regions of this template (see roi.py)
+    regions: Optional[Dict[str, List[float]]] = None  # ROI mode: normalized [x, y, w, h] per region
+    response_format: Optional[str] = None  # "json" (default) or "compact"; else negotiated via Accept
+    fields: Optional[List[str]] = None  # subset of result fields to return (default: all)
+    extract: bool = False  # KIE mode: return only the filter_text fields (country / weight / item)
+    extract_texts: bool = False  # KIE mode: also return the matched texts and their scores
+
+class JobRequest(BaseModel):
+    images: List[str]  # base64 encoded images, one page each
+    model_name: str = "default"
+    use_cache: bool = True
+    template: Optional[str] = None
+    regions: Optional[Dict[str, List[float]]] = None
 
 # Define response schema
 class OCRResponse(BaseModel):
     results: list
     status: str
 
-@app.post("/ocr", response_model=OCRResponse)
-async def perform_ocr(request: OCRRequest):
-    try:
-        # Decode base64 image to numpy array
-        image_bytes = base64.b64decode(request.image)
-        image = Image.open(BytesIO(image_bytes))
-        image = np.asarray(image)
-
-        if image.ndim !=3:
-            image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
-
-        # Run OCR inference using your syntax
-        result = ocr.predict(input=image)
-        response = [
-            {
+def format_result(item, image_shape, scale=1.0):
+    """
+    Convert one PaddleOCR result into the JSON-friendly response entry.
+    image_shape is the original image shape; scale is the preprocessing resize factor.
+    """
+    # PP-StructureV3 nests the plain OCR output under overall_ocr_res
+    if "overall_ocr_res" in item:
+        item = item["overall_ocr_res"]
+
+    with STAGE_SECONDS.time(stage="format"):
+        return {
             "rec_texts": item["rec_texts"],
-            "rec_boxes": item["rec_boxes"].tolist(),
+            "rec_boxes": to_original_coords(item["rec_boxes"], scale).tolist(),
             "rec_scores": item["rec_scores"],
-            "dt_polys": np.array(item["dt_polys"]).tolist(),
-            "image_dims": image.shape
-        } for item in result
-        ]
+            "dt_polys": to_original_coords(item["dt_polys"], scale).tolist(),
+            "image_dims": image_shape
+        }
 
-        return {
-            "results": response,
-            "status": "success"
+def resolve_encoding(request, response_format, fields, extract=False):
+    """Validate the requested response format and field selection, rejecting bad ones with 400"""
+    if extract and fields:
+        raise HTTPException(status_code=400, detail="fields cannot be combined with extract")
+    try:
+        return negotiate_format(response_format, request.headers.get("accept", "")), parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def render_response(results, accept_encoding="", response_format="json", fields=None):
+    """
+    Serialize (and compress) an OCRResponse body ourselves so the encoding cost is measured.
+    Called on the worker thread that ran OCR, since json.dumps + gzip of a large page would
+    otherwise block the event loop.
+    """
+    with STAGE_SECONDS.time(stage="serialize"):
+        body, media_type, headers = encode_results(results, response_format, fields, accept_encoding)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+def decode_base64(data):
+    """Decode a base64 image string; malformed or empty input is a 400"""
+    with STAGE_SECONDS.time(stage="decode"):
+        try:
+            image_bytes = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid base64 image: {e}")
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Empty image")
+    return image_bytes
+
+def decode_image(image_bytes):
+    """Decode raw image bytes to an RGB numpy array"""
+    with STAGE_SECONDS.time(stage="image_decode"):
+        image = decode_image_bytes(image_bytes, max_pixels=MAX_IMAGE_PIXELS)
+    IMAGE_MEGAPIXELS.observe(image.shape[0] * image.shape[1] / 1e6)
+    return image
+
+def prepare_image(image):
+    """Apply the preprocessing stage; returns (model input, original shape, scale)"""
+    with STAGE_SECONDS.time(stage="preprocess"):
+        resized, scale = downscale(image, **PREPROCESS_CONFIG)
+    return resized, image.shape, scale
+
+def next_page(pages):
+    """Rasterize and preprocess the next document page, or None when there are no more"""
+    page = next(pages, None)
+    return None if page is None else prepare_image(page)
+
+def resolve_model(model_name):
+    """Map a requested model name to a registry entry, rejecting unknown names with 400"""
+    try:
+        return registry.resolve(model_name)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+
+def resolve_roi(template, regions):
+    """Validate the ROI mode arguments, rejecting bad ones with 400"""
+    try:
+        return resolve_regions(template, regions, mvp_root=MVP_ROOT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def run_roi_ocr(image, model_name, regions):
+    """OCR only the padded regions of the page and merge them into one full-page result"""
+    rects = pixel_rects(regions, image.shape, padding=ROI_PADDING)
+
+    # All crops of the page go to the batcher together
+    with registry.pinned(model_name):
+        pending = []
+        for x1, y1, x2, y2 in rects:
+            crop, crop_shape, scale = prepare_image(np.ascontiguousarray(image[y1:y2, x1:x2]))
+            pending.append((batcher.submit(crop, key=model_name), crop_shape, scale))
+
+        entries = [format_result(future.result(), crop_shape, scale) for future, crop_shape, scale in pending]
+    return merge_entries(entries, rects, image.shape)
+
+def run_ocr(image_bytes, model_name=DEFAULT_MODEL, use_cache=True, regions=None, extract=False, extract_texts=False):
+    """
+    Blocking OCR pipeline; runs on a worker thread, never on the event loop.
+    Full results are cached; with extract=True only the filter_text fields are returned.
+    """
+    PAYLOAD_BYTES.observe(len(image_bytes))
+    cache_key = ResultCache.make_key(
+        image_bytes,
+        {
+            **registry.config(model_name),
+            "backend": BACKEND,
+            "preprocess": PREPROCESS_CONFIG,
+            "roi": {"regions": regions, "padding": ROI_PADDING} if regions else None
         }
-    
+    )
+    response = cache.get(cache_key) if use_cache else None
+    if response is None:
+        if regions:
+            response = [run_roi_ocr(decode_image(image_bytes), model_name, regions)]
+        else:
+            image, image_shape, scale = prepare_image(decode_image(image_bytes))
+
+            # Load and pin the model here, then run OCR inference; concurrent requests share one predict call
+            with registry.pinned(model_name):
+                item = batcher.submit(image, key=model_name).result()
+            response = [format_result(item, image_shape, scale)]
+
+        cache.put(cache_key, response)
+
+    if extract:
+        return run_extraction(response, include_texts=extract_texts)
+    return response
+
+def run_extraction(results, include_texts=False):
+    """KIE mode: reduce full OCR results to the filter_text fields"""
+    try:
+        with STAGE_SECONDS.time(stage="extract"):
+            return extract_fields(results, include_texts=include_texts, mvp_root=MVP_ROOT)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=501, detail=f"KIE mode needs the MVP package (set OCR_MVP_ROOT): {e}"
+        )
+
+async def run_in_worker(fn, *args, **kwargs):
+    """Run fn on the bounded worker pool, rejecting with 503 when it is saturated"""
+    try:
+        future = executor.submit(fn, *args, **kwargs)
+    except Saturated as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+    return await asyncio.wrap_future(future)
+
+@app.post("/ocr", response_model=OCRResponse)
+async def perform_ocr(request: OCRRequest, http_request: Request):
+    model_name = resolve_model(request.model_name)
+    regions = resolve_roi(request.template, request.regions)
+    response_format, fields = resolve_encoding(
+        http_request, request.response_format, request.fields, request.extract
+    )
+    accept_encoding = http_request.headers.get("accept-encoding", "")
+    try:
+        # Decode base64 image, run inference and serialize on the worker pool
+        return await run_in_worker(
+            lambda: render_response(
+                run_ocr(
+                    decode_base64(request.image), model_name, use_cache=request.use_cache, regions=regions,
+                    extract=request.extract, extract_texts=request.extract_texts
+                ),
+                accept_encoding, response_format, fields
+            )
+        )
+
+    except HTTPException:
+        raise
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnidentifiedImageError as e:
+        # Not retryable, so not a 5xx
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def read_upload(request: Request):
+    """Read raw bytes from an application/octet-stream body or a multipart 'file' field"""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart body must contain a 'file' field")
+        data = await upload.read()
+    else:
+        data = await request.body()
+
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty request body")
+    return data
+
+@app.post("/ocr/upload", response_model=OCRResponse)
+async def perform_ocr_upload(request: Request,
+                             model_name: str = "default",
+                             use_cache: bool = True,
+                             template: Optional[str] = None,
+                             response_format: Optional[str] = None,
+                             fields: Optional[str] = None,
+                             extract: bool = False,
+                             extract_texts: bool = False):
+    """
+    Same as /ocr, but takes the raw image bytes instead of base64 in JSON.
+    Accepts an application/octet-stream body or a multipart form with a 'file' field.
+    fields is a comma-separated list, e.g. ?fields=rec_texts,rec_boxes,rec_scores,image_dims
+    """
+    model_name = resolve_model(model_name)
+    regions = resolve_roi(template, None)
+    response_format, fields = resolve_encoding(
+        request, response_format, fields.split(",") if fields else None, extract
+    )
+    image_bytes = await read_upload(request)
+
+    accept_encoding = request.headers.get("accept-encoding", "")
+    try:
+        return await run_in_worker(
+            lambda: render_response(
+                run_ocr(
+                    image_bytes, model_name,
+                    use_cache=use_cache, regions=regions, extract=extract, extract_texts=extract_texts
+                ),
+                accept_encoding, response_format, fields
+            )
+        )
+
+    except HTTPException:
+        raise
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnidentifiedImageError as e:
+        # Not retryable, so not a 5xx
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/ocr/document")
+async def perform_ocr_document(request: Request, model_name: str = "default", stream_format: str = "ndjson"):
+    """
+    OCR a multi-page PDF or TIFF, streaming one line per page as soon as it is done.
+    Pages are rasterized lazily, so at most DOCUMENT_PAGE_WINDOW pages are in memory.
+
+    Each line is {"page", "page_count", "result"} where result has the same shape as an
+    entry of OCRResponse.results; a final {"status": "success", "page_count"} line ends the stream.
+    Use stream_format=sse for server-sent events instead of NDJSON.
+    """
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'ndjson' or 'sse'")
+    model_name = resolve_model(model_name)
+    data = await read_upload(request)
+
+    try:
+        # Load the model on a worker thread, not on the batcher thread
+        await run_in_worker(registry.get, model_name)
+        page_count, pages = await run_in_worker(open_document, data, dpi=PDF_DPI, max_pixels=MAX_IMAGE_PIXELS)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def encode(message):
+        line = json.dumps(message)
+        return f"data: {line}\n\n" if stream_format == "sse" else line + "\n"
+
+    def next_pinned_page():
+        """Next prepared page, with the model pinned until the page's batch is done"""
+        prepared = next_page(pages)
+        if prepared is not None:
+            registry.get(model_name, pin=True)
+        return prepared
+
+    async def stream_pages():
+        # Pages are pulled from the iterator one at a time on the worker pool;
+        # up to DOCUMENT_PAGE_WINDOW of them wait in the batcher concurrently.
+        in_flight = deque()
+        exhausted = False
+        index = 0
+        try:
+            while True:
+                while not exhausted and len(in_flight) < DOCUMENT_PAGE_WINDOW:
+                    prepared = await run_in_worker(next_pinned_page)
+                    if prepared is None:
+                        exhausted = True
+                        break
+                    page, shape, scale = prepared
+                    batch_future = batcher.submit(page, key=model_name)
+                    # Released by the batcher thread, even if the client has gone away by then
+                    batch_future.add_done_callback(lambda _: registry.release(model_name))
+                    future = asyncio.wrap_future(batch_future)
+                    in_flight.append((future, shape, scale))
+                    del page, prepared
+
+                if not in_flight:
+                    break
+
+                future, shape, scale = in_flight.popleft()
+                item = await future
+                yield encode({
+                    "page": index,
+                    "page_count": page_count,
+                    "result": format_result(item, shape, scale)
+                })
+                index += 1
+
+            yield encode({"status": "success", "page_count": page_count})
+
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield encode({"status": "error", "page": index, "detail": detail})
+        finally:
+            try:
+                pages.close()
+            except ValueError:
+                # A worker is still rendering a page; the iterator is dropped instead
+                pass
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(stream_pages(), media_type=media_type)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request, model_name: str = "default", template: Optional[str] = None):
+    """
+    Queue one or many images for background OCR and return a job id immediately.
+    Accepts a JobRequest JSON body, or a multipart form with one or more 'file' fields
+    (then model_name / template are query parameters).
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        images = [await upload.read() for upload in form.getlist("file") if not isinstance(upload, str)]
+        use_cache, regions = True, None
+    else:
+        try:
+            job = JobRequest(**await request.json())
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        images = await run_in_worker(lambda: [decode_base64(image) for image in job.images])
+        model_name, template, regions, use_cache = job.model_name, job.template, job.regions, job.use_cache
+
+    if not images:
+        raise HTTPException(status_code=400, detail="No images submitted")
+    if not all(images):
+        raise HTTPException(status_code=400, detail="Empty image")
+    model_name = resolve_model(model_name)
+    regions = resolve_roi(template, regions)
+
+    job_id = await run_in_worker(
+        job_store.create, images, model_name, {"use_cache": use_cache, "regions": regions}
+    )
+    job_workers.notify()
+    return {"job_id": job_id, "status": "queued", "page_count": len(images)}
+
+def get_job_status(job_id):
+    status = job_store.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return status
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str, include_results: bool = False):
+    """Job progress; include_results=true also returns the pages finished so far"""
+    status = get_job_status(job_id)
+    if include_results:
+        status["results"] = await run_in_worker(lambda: list(job_store.iter_results(job_id)))
+    return status
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str):
+    """Stream the finished pages of a job as NDJSON ({"page", "status", "result" | "error"} per line)"""
+    get_job_status(job_id)
+    lines = (json.dumps(page) + "\n" for page in job_store.iter_results(job_id))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the preloaded models are warmed up, 503 while starting or failed"""
+    body = {**readiness, "models": registry.status()["loaded"]}
+    status_code = 200 if readiness["status"] == "ready" else 503
+    return JSONResponse(body, status_code=status_code)
+
 @app.get("/health")
 async def health_check():
+    """Liveness probe and server statistics; answers even while models are loading"""
+    # The SQLite queries run on the worker pool; when it is saturated the probe still answers,
+    # only without these two
+    try:
+        cache_stats, pending_pages = await run_in_worker(lambda: (cache.stats(), job_store.pending_count()))
+    except HTTPException:
+        cache_stats = pending_pages = None
     return {
-        "status": "Model loaded and ready",
-        "model_config": {
-            "use_doc_orientation_classify": False,
-            "use_doc_unwarping": False,
-            "use_textline_orientation": False
-        }
+        "status": "ok",
+        "readiness": readiness["status"],
+        "backend": BACKEND,
+        "model_config": MODEL_CONFIG,
+        "models": registry.status(),
+        "batching": batcher.stats(),
+        "executor": executor.stats(),
+        "cache": cache_stats,
+        "jobs": {"pending_pages": pending_pages}
     }
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text-format metrics: per-stage latency, request counts, payload sizes"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    job_workers.stop()
+    executor.shutdown()
+    batcher.close()
+    cache.close()
+    job_store.close()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
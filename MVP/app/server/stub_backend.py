@@ -0,0 +1,107 @@
+"""
+Stub OCR backend that replays recorded PaddleOCR results after a simulated inference delay.
+Lets the whole FastAPI stack run without PaddleOCR or a GPU, e.g. for load tests on a laptop.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Used when no recording file is given: one certificate-of-origin page, as returned by /ocr
+DEFAULT_RECORDING = [{
+    "rec_texts": ["CERTIFICATE OF ORIGIN", "Country of origin: TURKEY", "Gross weight 850,00 KG"],
+    "rec_boxes": [[60, 92, 520, 130], [60, 182, 610, 220], [60, 272, 590, 310]],
+    "rec_scores": [0.998, 0.991, 0.987],
+    "dt_polys": [
+        [[60, 92], [520, 92], [520, 130], [60, 130]],
+        [[60, 182], [610, 182], [610, 220], [60, 220]],
+        [[60, 272], [590, 272], [590, 310], [60, 310]],
+    ],
+    "image_dims": [1000, 800],
+}]
+
+
+def load_recording(path: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Read recorded results from a JSON file.
+
+    Accepts a saved /ocr response ({"results": [...]}) or a bare list of result entries.
+    Returns DEFAULT_RECORDING when path is empty.
+    """
+    if not path:
+        return DEFAULT_RECORDING
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data["results"] if isinstance(data, dict) else data
+    if not entries:
+        raise ValueError(f"No recorded results in {path}")
+    return entries
+
+
+class StubPipeline:
+    """Mimics the predict() interface of the paddleocr pipelines."""
+
+    def __init__(self,
+                 recording: List[Dict[str, Any]],
+                 delay_ms: float = 200,
+                 per_image_ms: float = 20,
+                 wrap_key: Optional[str] = None):
+        """
+        Args:
+            recording: Recorded result entries, replayed round-robin
+            delay_ms: Fixed cost of one predict call
+            per_image_ms: Extra cost per image in the call, so batching behaves like the real model
+            wrap_key: Nest each result under this key (PPStructureV3 returns "overall_ocr_res")
+        """
+        self.recording = recording
+        self.delay_ms = delay_ms
+        self.per_image_ms = per_image_ms
+        self.wrap_key = wrap_key
+
+        # Like the real model, one predict call runs at a time
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def predict(self, input):
+        images = input if isinstance(input, list) else [input]
+        with self._lock:
+            time.sleep((self.delay_ms + self.per_image_ms * len(images)) / 1000)
+            results = []
+            for image in images:
+                entry = self.recording[self._next % len(self.recording)]
+                self._next += 1
+                result = self._replay(entry, image.shape[:2])
+                results.append({self.wrap_key: result} if self.wrap_key else result)
+        return results
+
+    @staticmethod
+    def _replay(entry: Dict[str, Any], image_shape) -> Dict[str, Any]:
+        """Scale the recorded boxes to the size of the image being 'predicted'."""
+        # /ocr reports image_dims as [H, W, C]
+        recorded_height, recorded_width = (entry.get("image_dims") or image_shape)[:2]
+        factors = np.array([image_shape[1] / recorded_width, image_shape[0] / recorded_height])
+
+        boxes = np.asarray(entry["rec_boxes"], dtype=np.float64).reshape(-1, 4)
+        return {
+            "rec_texts": list(entry["rec_texts"]),
+            "rec_boxes": np.rint(boxes * np.tile(factors, 2)).astype(np.int16),
+            "rec_scores": list(entry["rec_scores"]),
+            "dt_polys": [
+                np.rint(np.asarray(poly, dtype=np.float64) * factors).astype(np.int16)
+                for poly in entry.get("dt_polys", [])
+            ],
+        }
+
+
+def make_stub_loader(recording_path: Optional[str] = None, delay_ms: float = 200, per_image_ms: float = 20):
+    """Build a ModelRegistry loader that returns StubPipelines instead of paddleocr models."""
+    recording = load_recording(recording_path)
+
+    def load_stub_pipeline(pipeline: str, params: Dict[str, Any]):
+        wrap_key = "overall_ocr_res" if pipeline == "PPStructureV3" else None
+        return StubPipeline(recording, delay_ms=delay_ms, per_image_ms=per_image_ms, wrap_key=wrap_key)
+
+    return load_stub_pipeline
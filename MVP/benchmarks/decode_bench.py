@@ -0,0 +1,91 @@
+"""
+Microbenchmark: server image decode paths.
+Compares the original PIL -> np.asarray -> cv2.cvtColor path with preprocess.decode_image_bytes.
+
+Usage:
+    python MVP/benchmarks/decode_bench.py                       # synthetic A4 scans
+    python MVP/benchmarks/decode_bench.py --image scan.png --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# The server modules are deployed as a flat directory, not a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "server"))
+from preprocess import decode_image_bytes  # noqa: E402
+
+
+def legacy_decode(image_bytes):
+    """The decode path server.py used before decode_image_bytes"""
+    image = Image.open(BytesIO(image_bytes))
+    image = np.asarray(image)
+
+    if image.ndim != 3:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    return image
+
+
+def synthetic_scans(height=3508, width=2480):
+    """A4 @ 300 dpi page with text-like noise, encoded in the formats scanners send"""
+    rng = np.random.default_rng(0)
+    page = np.full((height, width), 245, dtype=np.uint8)
+    for y in range(200, height - 200, 60):
+        x = int(rng.integers(150, 400))
+        line = rng.integers(0, 80, size=(20, width - 2 * x), dtype=np.uint8)
+        page[y:y + 20, x:width - x] = line
+
+    scans = {}
+    for name, image, fmt, options in [
+        ("png-gray", Image.fromarray(page), "PNG", {}),
+        ("png-rgb", Image.fromarray(page).convert("RGB"), "PNG", {}),
+        ("jpeg-rgb", Image.fromarray(page).convert("RGB"), "JPEG", {"quality": 90}),
+    ]:
+        buffer = BytesIO()
+        image.save(buffer, fmt, **options)
+        scans[name] = buffer.getvalue()
+    return scans
+
+
+def bench(fn, data, repeat):
+    fn(data)  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - started)
+    return 1000 * float(np.median(timings)), 1000 * float(np.min(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server image decode paths")
+    parser.add_argument("--image", "-i", action="append", help="Image file(s) to decode (default: synthetic scans)")
+    parser.add_argument("--repeat", "-r", type=int, default=10, help="Timed runs per path")
+    args = parser.parse_args()
+
+    if args.image:
+        scans = {}
+        for path in args.image:
+            with open(path, "rb") as f:
+                scans[os.path.basename(path)] = f.read()
+    else:
+        scans = synthetic_scans()
+
+    print(f"{'input':<20} {'MB':>6} {'legacy ms':>12} {'fast ms':>12} {'speedup':>8}")
+    for name, data in scans.items():
+        legacy_median, _ = bench(legacy_decode, data, args.repeat)
+        fast_median, _ = bench(decode_image_bytes, data, args.repeat)
+        print(
+            f"{name:<20} {len(data) / 1e6:>6.2f} {legacy_median:>12.1f} {fast_median:>12.1f} "
+            f"{legacy_median / fast_median:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
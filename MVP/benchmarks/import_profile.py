@@ -0,0 +1,122 @@
+"""
+Import-time profile for the client entry points.
+Imports each module in a fresh interpreter with `python -X importtime`, reports total import time and
+the heaviest imports, and fails if a module exceeds its budget or pulls in a dependency that should
+only load on first use (gradio, pymongo, requests by default).
+
+Usage:
+    python MVP/benchmarks/import_profile.py
+    python MVP/benchmarks/import_profile.py MVP.utils.pipeline.batch --budget-ms 150 --top 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = ("MVP.app", "MVP.app.app", "MVP.utils.pipeline", "MVP.utils.pipeline.batch", "MVP.utils.filtering")
+
+# Heavy or side-effecting dependencies the entry points must not import eagerly
+DEFAULT_FORBIDDEN = ("gradio", "pymongo", "requests")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _importtime(statement):
+    """Run `statement` in a fresh interpreter; returns [(name, depth, self_ms, cumulative_ms)] in report order"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=env, cwd=REPO_ROOT
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"{statement} failed:\n{process.stderr.strip().splitlines()[-1]}")
+
+    rows = []
+    for line in process.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package", nesting shown by indentation
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def profile_import(module, runs=3):
+    """
+    Import `module` in `runs` fresh interpreters and keep the fastest run. Modules the interpreter
+    loads at startup anyway (site, .pth hooks) are left out.
+
+    Returns:
+        Dict with total_ms and per-import {name: (self_ms, cumulative_ms)} of that run
+    """
+    startup = {name for name, _, _, _ in _importtime("pass")}
+    best = None
+    for _ in range(runs):
+        rows = [row for row in _importtime(f"import {module}") if row[0] not in startup]
+        imports = {name: (self_ms, cumulative_ms) for name, _, self_ms, cumulative_ms in rows}
+        total_ms = sum(cumulative_ms for _, depth, _, cumulative_ms in rows if depth == 0)
+        if best is None or total_ms < best["total_ms"]:
+            best = {"total_ms": total_ms, "imports": imports}
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of the client entry points")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES), help="Modules to import")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest top-level packages to list per module")
+    parser.add_argument("--budget-ms", type=float, help="Exit code 1 if a module takes longer to import")
+    parser.add_argument("--forbid", default=",".join(DEFAULT_FORBIDDEN),
+                        help="Comma-separated packages that must not be imported (empty to disable)")
+    parser.add_argument("--output", "-o", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    forbidden = [name for name in args.forbid.split(",") if name]
+    report, failed = {}, False
+    for module in args.modules:
+        profile = profile_import(module, args.runs)
+        imports = profile["imports"]
+
+        # Cumulative time per third-party / stdlib top-level package, counted at its outermost import
+        packages = {}
+        for name, (_, cumulative_ms) in imports.items():
+            top = name.split(".")[0]
+            if top != module.split(".")[0]:
+                packages[top] = max(packages.get(top, 0.0), cumulative_ms)
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+        eager = [name for name in forbidden if name in imports]
+        over_budget = args.budget_ms is not None and profile["total_ms"] > args.budget_ms
+        failed = failed or bool(eager) or over_budget
+
+        report[module] = {
+            "total_ms": round(profile["total_ms"], 1),
+            "modules_imported": len(imports),
+            "heaviest": {name: round(ms, 1) for name, ms in heaviest},
+            "eager_forbidden": eager,
+            "over_budget": over_budget,
+        }
+
+        flags = []
+        if eager:
+            flags.append(f"imports {', '.join(eager)}")
+        if over_budget:
+            flags.append(f"over {args.budget_ms:.0f} ms budget")
+        print(f"{module:<28} {profile['total_ms']:8.1f} ms  {len(imports):4d} modules  "
+              f"{'FAIL: ' + '; '.join(flags) if flags else 'ok'}")
+        print("    " + ", ".join(f"{name} {ms:.1f}" for name, ms in heaviest))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Load generator for the OCR server.
+Drives /ocr (base64 JSON) or /ocr/upload (raw bytes) at a fixed concurrency or request rate and
+writes a JSON report with throughput, latency percentiles and error rate.
+
+Usage:
+    # Server with the stub backend, no GPU needed
+    cd MVP/app/server && OCR_BACKEND=stub OCR_STUB_DELAY_MS=150 python server.py
+
+    python MVP/benchmarks/loadgen.py --concurrency 16 --duration 30 --output after.json
+    python MVP/benchmarks/loadgen.py --rate 40 --duration 30 --baseline before.json
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import requests
+from PIL import Image, ImageDraw
+
+# Report keys where higher is worse / lower is worse, checked against --baseline
+LOWER_IS_BETTER = ("latency_ms.p50", "latency_ms.p95", "latency_ms.p99", "error_rate")
+HIGHER_IS_BETTER = ("throughput_rps",)
+
+
+def synthetic_page(height=1400, width=1000):
+    """PNG of a white page with a few lines of text, used when no --image is given"""
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+    lines = ["CERTIFICATE OF ORIGIN", "Exporter: ACME TEKSTIL A.S.", "Country of origin: TURKEY",
+             "Gross weight 850,00 KG", "Invoice No: 2024/0117"]
+    for i, text in enumerate(lines):
+        draw.text((80, 120 + 80 * i), text, fill=0)
+    buffer = BytesIO()
+    page.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class LoadGenerator:
+    """Sends requests from worker threads and records per-request latency and status."""
+
+    def __init__(self, url, images, endpoint="ocr", model_name="default", use_cache=False, timeout=60):
+        self.url = url.rstrip("/")
+        self.endpoint = endpoint
+        self.model_name = model_name
+        self.use_cache = use_cache
+        self.timeout = timeout
+
+        # Encode once up front so the generator itself stays cheap
+        if endpoint == "ocr":
+            self.payloads = [
+                json.dumps({
+                    "image": base64.b64encode(image).decode("utf-8"),
+                    "model_name": model_name,
+                    "use_cache": use_cache,
+                }).encode("utf-8")
+                for image in images
+            ]
+        else:
+            self.payloads = images
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.samples = []  # (latency seconds, status code or error name)
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def send(self, scheduled_at=None):
+        """
+        Send one request and record it.
+
+        Args:
+            scheduled_at: perf_counter time the request was due (rate mode). Latency is measured from
+                it, so time spent waiting for a free sender counts (no coordinated omission).
+        """
+        payload = random.choice(self.payloads)
+        started = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            if self.endpoint == "ocr":
+                response = self._session().post(
+                    f"{self.url}/ocr", data=payload,
+                    headers={"Content-Type": "application/json"}, timeout=self.timeout
+                )
+            else:
+                response = self._session().post(
+                    f"{self.url}/ocr/upload", data=payload,
+                    params={"model_name": self.model_name, "use_cache": str(self.use_cache).lower()},
+                    headers={"Content-Type": "application/octet-stream"}, timeout=self.timeout
+                )
+            outcome = response.status_code
+        except requests.RequestException as e:
+            outcome = type(e).__name__
+        latency = time.perf_counter() - started
+
+        with self._lock:
+            self.samples.append((latency, outcome))
+
+    def run_closed_loop(self, concurrency, duration=None, total_requests=None):
+        """Each of `concurrency` senders issues its next request as soon as the previous one returns"""
+        deadline = time.perf_counter() + duration if duration else None
+        remaining = [total_requests]
+        counter_lock = threading.Lock()
+
+        def sender():
+            while deadline is None or time.perf_counter() < deadline:
+                if total_requests is not None:
+                    with counter_lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                self.send()
+
+        threads = [threading.Thread(target=sender, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_open_loop(self, rate, concurrency, duration=None, total_requests=None):
+        """Issue requests on a Poisson schedule at `rate` per second, independent of response times"""
+        count = total_requests if total_requests is not None else int(rate * duration)
+        due = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(count):
+                due += random.expovariate(rate)
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send, due)
+
+
+def build_report(samples, elapsed, config):
+    """Summarize recorded samples; only 2xx responses count as successes"""
+    latencies = np.array([latency for latency, _ in samples]) * 1000
+    ok = np.array([isinstance(outcome, int) and 200 <= outcome < 300 for _, outcome in samples], dtype=bool)
+
+    outcomes = {}
+    for _, outcome in samples:
+        outcomes[str(outcome)] = outcomes.get(str(outcome), 0) + 1
+
+    ok_latencies = latencies[ok] if ok.any() else np.array([0.0])
+    return {
+        "config": config,
+        "duration_s": round(elapsed, 3),
+        "requests": len(samples),
+        "succeeded": int(ok.sum()),
+        "failed": int((~ok).sum()),
+        "error_rate": round(float((~ok).mean()), 4) if samples else 0.0,
+        "throughput_rps": round(float(ok.sum()) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(float(ok_latencies.mean()), 1),
+            "p50": round(float(np.percentile(ok_latencies, 50)), 1),
+            "p95": round(float(np.percentile(ok_latencies, 95)), 1),
+            "p99": round(float(np.percentile(ok_latencies, 99)), 1),
+            "max": round(float(ok_latencies.max()), 1),
+        },
+        "status_codes": outcomes,
+    }
+
+
+def _lookup(report, dotted_key):
+    value = report
+    for part in dotted_key.split("."):
+        value = value[part]
+    return value
+
+
+def compare(report, baseline, tolerance):
+    """
+    List the metrics that regressed by more than `tolerance` (fraction) against the baseline report.
+    Error rate is compared in absolute terms.
+    """
+    regressions = []
+    for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+        current, previous = _lookup(report, key), _lookup(baseline, key)
+        if key == "error_rate":
+            worse = current - previous > tolerance
+        elif key in LOWER_IS_BETTER:
+            worse = previous > 0 and current > previous * (1 + tolerance)
+        else:
+            worse = current < previous * (1 - tolerance)
+        if worse:
+            regressions.append({"metric": key, "baseline": previous, "current": current})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the OCR server and report latency/throughput as JSON")
+    parser.add_argument("--url", default="http://localhost:8000", help="Server base URL")
+    parser.add_argument("--endpoint", choices=("ocr", "upload"), default="ocr",
+                        help="ocr: base64 JSON to /ocr; upload: raw bytes to /ocr/upload")
+    parser.add_argument("--image", "-i", action="append", help="Image file(s) to send (default: synthetic page)")
+    parser.add_argument("--model-name", default="default")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Allow server cache hits (off by default so every request runs inference)")
+    parser.add_argument("--concurrency", "-c", type=int, default=8,
+                        help="Concurrent senders (closed loop), or the sender pool size with --rate")
+    parser.add_argument("--rate", "-r", type=float, help="Open loop: target requests per second")
+    parser.add_argument("--duration", "-d", type=float, default=30, help="Test length in seconds")
+    parser.add_argument("--requests", "-n", type=int, help="Stop after this many requests instead of --duration")
+    parser.add_argument("--warmup", type=int, default=5, help="Unrecorded requests sent first")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--output", "-o", help="Write the JSON report here (default: stdout only)")
+    parser.add_argument("--baseline", help="Earlier report to compare against; exit code 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression against --baseline (default 0.10)")
+    args = parser.parse_args()
+
+    if args.image:
+        images = []
+        for path in args.image:
+            with open(path, "rb") as f:
+                images.append(f.read())
+    else:
+        images = [synthetic_page()]
+
+    generator = LoadGenerator(
+        args.url, images, endpoint=args.endpoint, model_name=args.model_name,
+        use_cache=args.use_cache, timeout=args.timeout
+    )
+
+    for _ in range(args.warmup):
+        generator.send()
+    generator.samples.clear()
+
+    duration = None if args.requests else args.duration
+    started = time.perf_counter()
+    if args.rate:
+        generator.run_open_loop(args.rate, args.concurrency, duration, args.requests)
+    else:
+        generator.run_closed_loop(args.concurrency, duration, args.requests)
+    elapsed = time.perf_counter() - started
+
+    config = {
+        "url": args.url,
+        "endpoint": args.endpoint,
+        "model_name": args.model_name,
+        "mode": "open" if args.rate else "closed",
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "images": [os.path.basename(path) for path in args.image] if args.image else ["synthetic"],
+        "use_cache": args.use_cache,
+    }
+    report = build_report(generator.samples, elapsed, config)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Microbenchmark: OCR region queries as the number of template fields and boxes per page grows.
+Compares the per-box Python loop (calculate_iok), the vectorized linear scan (query_region_indices)
+and the per-page BoxGridIndex, checking that all three return the same boxes in the same order.
+
+Usage:
+    python MVP/benchmarks/region_query_bench.py
+    python MVP/benchmarks/region_query_bench.py --boxes 200 2000 --fields 3 50 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from MVP.utils.filtering.filter_texts import calculate_iok, query_region_indices  # noqa: E402
+from MVP.utils.filtering.spatial_index import BoxGridIndex  # noqa: E402
+
+IOK_THRESHOLD = 0.7
+
+
+def synthetic_page(n_boxes, height=3508, width=2480, seed=0):
+    """Word-sized boxes laid out in text lines, like PaddleOCR output on a dense A4 scan"""
+    rng = np.random.default_rng(seed)
+    lines = max(1, int(np.sqrt(n_boxes * 1.5)))
+    y = rng.choice(np.linspace(100, height - 140, lines).astype(int), size=n_boxes)
+    x = rng.integers(80, width - 400, size=n_boxes)
+    w = rng.integers(40, 400, size=n_boxes)
+    h = rng.integers(25, 45, size=n_boxes)
+    return np.stack([x, y, x + w, y + h], axis=1).tolist()
+
+
+def synthetic_fields(n_fields, height=3508, width=2480, seed=1):
+    """Field regions sized like the ones in CATEGORY_TO_BBOX (5-40% of the page width)"""
+    rng = np.random.default_rng(seed)
+    w = rng.uniform(0.05, 0.4, size=n_fields) * width
+    h = rng.uniform(0.02, 0.15, size=n_fields) * height
+    x = rng.uniform(0, width - w)
+    y = rng.uniform(0, height - h)
+    return np.stack([x, y, x + w, y + h], axis=1).astype(int).tolist()
+
+
+def python_loop(fields, boxes):
+    """What query_ocr_region did per field before vectorization"""
+    results = []
+    for field in fields:
+        matches = [(box, i) for i, box in enumerate(boxes) if calculate_iok(field, box) >= IOK_THRESHOLD]
+        matches.sort(key=lambda match: (match[0][1], match[0][0]))
+        results.append([i for _, i in matches])
+    return results
+
+
+def linear_scan(fields, boxes):
+    return [region.tolist() for region in query_region_indices(fields, boxes, IOK_THRESHOLD)[0]]
+
+
+def grid_index(fields, boxes):
+    return [region.tolist() for region in BoxGridIndex(boxes).query(fields, IOK_THRESHOLD)[0]]
+
+
+def bench(fn, repeat):
+    fn()  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return 1000 * float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR region queries: loop vs vectorized scan vs grid index")
+    parser.add_argument("--boxes", type=int, nargs="+", default=[100, 500, 2000, 10000], help="Boxes per page")
+    parser.add_argument("--fields", type=int, nargs="+", default=[3, 12, 50, 200], help="Template fields")
+    parser.add_argument("--repeat", "-r", type=int, default=10, help="Timed runs per configuration")
+    parser.add_argument("--skip-loop", action="store_true", help="Leave out the slow Python loop")
+    args = parser.parse_args()
+
+    print(f"{'boxes':>6} {'fields':>6} {'loop ms':>9} {'scan ms':>9} {'index ms':>9} "
+          f"{'build ms':>9} {'query ms':>9} {'scan/index':>10}")
+    for n_boxes in args.boxes:
+        boxes = synthetic_page(n_boxes)
+        for n_fields in args.fields:
+            fields = synthetic_fields(n_fields)
+
+            expected = linear_scan(fields, boxes)
+            assert grid_index(fields, boxes) == expected, "index results differ from the linear scan"
+            loop_ms = None
+            if not args.skip_loop:
+                assert python_loop(fields, boxes) == expected, "loop results differ from the linear scan"
+                loop_ms = bench(lambda: python_loop(fields, boxes), max(1, args.repeat // 5))
+
+            scan_ms = bench(lambda: linear_scan(fields, boxes), args.repeat)
+            index_ms = bench(lambda: grid_index(fields, boxes), args.repeat)
+            build_ms = bench(lambda: BoxGridIndex(boxes), args.repeat)
+            index = BoxGridIndex(boxes)
+            query_ms = bench(lambda: index.query(fields, IOK_THRESHOLD), args.repeat)
+
+            loop = f"{loop_ms:>9.2f}" if loop_ms is not None else f"{'-':>9}"
+            print(f"{n_boxes:>6} {n_fields:>6} {loop} {scan_ms:>9.2f} {index_ms:>9.2f} "
+                  f"{build_ms:>9.2f} {query_ms:>9.2f} {scan_ms / index_ms:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+from .response_cache import ResponseCache, file_hash, DEFAULT_CACHE_PATH
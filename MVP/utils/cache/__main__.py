@@ -0,0 +1,94 @@
+"""
+Inspect or purge the client-side OCR response cache.
+
+Usage:
+    python -m MVP.utils.cache stats
+    python -m MVP.utils.cache list --limit 20
+    python -m MVP.utils.cache purge --older-than 30        # days unused
+    python -m MVP.utils.cache purge --all
+    python -m MVP.utils.cache extract --output kie.jsonl   # re-run filter_text on cached results
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from .response_cache import DEFAULT_CACHE_PATH, ResponseCache
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m MVP.utils.cache", description="OCR response cache maintenance")
+    parser.add_argument("--path", default=os.environ.get("OCR_RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                        help="Cache file (default: $OCR_RESPONSE_CACHE_PATH or %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("stats", help="Entry count, size and models")
+
+    list_parser = commands.add_parser("list", help="Entries, most recently used first")
+    list_parser.add_argument("--limit", type=int, default=50)
+
+    purge_parser = commands.add_parser("purge", help="Delete entries")
+    purge_parser.add_argument("--all", action="store_true", help="Delete every entry")
+    purge_parser.add_argument("--older-than", type=float, metavar="DAYS", help="Entries unused for this many days")
+    purge_parser.add_argument("--model", help="Entries of this model only")
+
+    extract_parser = commands.add_parser("extract", help="Re-run filter_text on cached results, as JSONL")
+    extract_parser.add_argument("--model", help="Entries of this model only")
+    extract_parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        parser.error(f"no cache at {args.path}")
+    cache = ResponseCache(args.path, max_bytes=0)
+
+    try:
+        if args.command == "stats":
+            print(json.dumps(cache.stats(), indent=2))
+
+        elif args.command == "list":
+            print(f"{'file_hash':<16} {'model':<16} {'upload':<24} {'KB':>8} {'hits':>5} {'last used':<16} source")
+            for entry in cache.entries(args.limit):
+                print(
+                    f"{entry['file_hash'][:16]} {entry['model']:<16} {entry['upload'] or 'original':<24} "
+                    f"{entry['size'] / 1024:>8.1f} "
+                    f"{entry['hits']:>5} {_format_time(entry['last_used']):<16} {entry['source'] or ''}"
+                )
+
+        elif args.command == "purge":
+            if not (args.all or args.older_than is not None or args.model):
+                parser.error("purge needs --all, --older-than or --model")
+            older_than = args.older_than * 86400 if args.older_than is not None else None
+            deleted = cache.purge(older_than=older_than, model=args.model)
+            cache.vacuum()
+            print(f"Deleted {deleted} entries")
+
+        elif args.command == "extract":
+            # Imported here so the other commands work without the filtering dependencies
+            from MVP.utils.pipeline import extract_infos
+
+            output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+            try:
+                for entry in cache.iter_results(args.model):
+                    record = {
+                        "file_hash": entry["file_hash"],
+                        "model": entry["model"],
+                        "upload": entry["upload"],
+                        "source_file": entry["source"],
+                        "infos": extract_infos(entry["results"]),
+                    }
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
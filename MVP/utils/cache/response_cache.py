@@ -0,0 +1,215 @@
+"""
+Client-side persistent cache of OCR results, keyed by file content hash, model and upload settings.
+Re-processing a known document skips the network and the GPU; KIE can be re-run on the stored results.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ocr-mvp", "responses.sqlite3")
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of zlib-compressed result JSON, evicting least recently used entries beyond max_bytes."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 500 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file (parent directories are created)
+            max_bytes: Upper bound for the stored (compressed) results; 0 disables eviction
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " file_hash TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " upload TEXT NOT NULL DEFAULT '',"
+            " results BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " source TEXT,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (file_hash, model, upload));"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(responses)")]
+        if "upload" not in columns:
+            # Caches from before the upload settings were part of the key: the results stay available
+            # to entries() / iter_results(), but are never served, since it is unknown whether the
+            # file was shrunk before upload
+            self._db.executescript(
+                "ALTER TABLE responses RENAME TO responses_old;"
+                "DROP INDEX IF EXISTS responses_last_used;"
+                "CREATE TABLE responses ("
+                " file_hash TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " upload TEXT NOT NULL DEFAULT '',"
+                " results BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " source TEXT,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " hits INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (file_hash, model, upload));"
+                "INSERT INTO responses"
+                " SELECT file_hash, model, 'legacy', results, size, source, created_at, last_used, hits"
+                " FROM responses_old;"
+                "DROP TABLE responses_old;"
+            )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._db.commit()
+
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, digest: str, model: str, upload: str = "") -> Optional[List[Dict[str, Any]]]:
+        """Stored results for a file hash, model and upload settings ("" for the original file), or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results FROM responses WHERE file_hash = ? AND model = ? AND upload = ?",
+                (digest, model, upload)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1"
+                " WHERE file_hash = ? AND model = ? AND upload = ?",
+                (time.time(), digest, model, upload)
+            )
+            self._db.commit()
+            self._hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self,
+            digest: str,
+            model: str,
+            results: List[Dict[str, Any]],
+            source: Optional[str] = None,
+            upload: str = ""):
+        """Store results and evict the least recently used entries if the cache grew past max_bytes."""
+        blob = zlib.compress(json.dumps(results).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (file_hash, model, upload, results, size, source, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, model, upload, blob, len(blob), source, now, now)
+            )
+            if self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT rowid, size FROM responses ORDER BY last_used").fetchall()
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE rowid = ?", (rowid,))
+            total -= size
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Metadata of stored entries, most recently used first."""
+        query = (
+            "SELECT file_hash, model, upload, size, source, created_at, last_used, hits"
+            " FROM responses ORDER BY last_used DESC"
+        )
+        params = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        keys = ("file_hash", "model", "upload", "size", "source", "created_at", "last_used", "hits")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def iter_results(self, model: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield {"file_hash", "model", "upload", "source", "results"} for every entry, e.g. to re-run KIE."""
+        query = "SELECT rowid, file_hash, model, upload, source FROM responses"
+        params = ()
+        if model:
+            query += " WHERE model = ?"
+            params = (model,)
+        with self._lock:
+            keys = self._db.execute(query, params).fetchall()
+        for rowid, digest, entry_model, upload, source in keys:
+            with self._lock:
+                row = self._db.execute("SELECT results FROM responses WHERE rowid = ?", (rowid,)).fetchone()
+            if row is not None:
+                yield {
+                    "file_hash": digest,
+                    "model": entry_model,
+                    "upload": upload,
+                    "source": source,
+                    "results": json.loads(zlib.decompress(row[0])),
+                }
+
+    def purge(self, older_than: Optional[float] = None, model: Optional[str] = None) -> int:
+        """
+        Delete entries; with no arguments, all of them.
+
+        Args:
+            older_than: Only entries not used for this many seconds
+            model: Only entries of this model
+
+        Returns:
+            Number of deleted entries
+        """
+        conditions, params = [], []
+        if older_than is not None:
+            conditions.append("last_used < ?")
+            params.append(time.time() - older_than)
+        if model:
+            conditions.append("model = ?")
+            params.append(model)
+        query = "DELETE FROM responses" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+        with self._lock:
+            deleted = self._db.execute(query, params).rowcount
+            self._db.commit()
+        return deleted
+
+    def vacuum(self):
+        """Give the space of deleted entries back to the filesystem."""
+        with self._lock:
+            self._db.execute("VACUUM")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            models = dict(self._db.execute("SELECT model, COUNT(*) FROM responses GROUP BY model").fetchall())
+        return {
+            "path": self.path,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "models": models,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
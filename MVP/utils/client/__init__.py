@@ -0,0 +1 @@
+from .ocr_client import OCRClient, OCRClientError, CircuitOpenError
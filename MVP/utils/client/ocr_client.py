@@ -0,0 +1,471 @@
+"""
+HTTP client for the remote OCR server(s): pooled keep-alive connections, timeouts,
+retries with jittered backoff, circuit breakers, least-loaded routing across replicas,
+request hedging and per-call latency recording.
+"""
+
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+# Statuses worth retrying: the server is restarting, overloaded (503 + Retry-After) or crashed
+RETRY_STATUSES = {500, 502, 503, 504}
+
+# Of those, only gateway errors count toward the circuit breaker (with transport errors). A 500
+# is often caused by one bad document, and 503 + Retry-After is deliberate backpressure.
+BREAKER_STATUSES = {502, 503, 504}
+
+SERVER_TIMING = re.compile(r"app;dur=([\d.]+)")
+
+
+class OCRClientError(RuntimeError):
+    """Raised when a request fails for good (after retries, or with a non-retryable status)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(OCRClientError):
+    """Raised without contacting the server while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for reset_timeout seconds.
+    Then a single trial call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_neutral(self):
+        """End a call that says nothing about the server's health (e.g. backpressure)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call is allowed (0 when closed)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+
+class LatencyRecorder:
+    """Keeps the last max_samples calls: total time, server-reported time and the network remainder."""
+
+    def __init__(self, max_samples: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)  # (total_ms, server_ms or None)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+
+    def record(self, total_ms: float, server_ms: Optional[float]):
+        with self._lock:
+            self._samples.append((total_ms, server_ms))
+
+    def count(self, calls: int = 0, failures: int = 0, retries: int = 0, hedges: int = 0):
+        with self._lock:
+            self.calls += calls
+            self.failures += failures
+            self.retries += retries
+            self.hedges += hedges
+
+    def summary(self) -> Dict[str, Any]:
+        """Percentiles in milliseconds; network = total - server for responses with Server-Timing."""
+        with self._lock:
+            samples = list(self._samples)
+            summary = {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "hedges": self.hedges,
+            }
+
+        def percentiles(values):
+            if not values:
+                return None
+            values = np.asarray(values)
+            return {
+                "p50": round(float(np.percentile(values, 50)), 1),
+                "p95": round(float(np.percentile(values, 95)), 1),
+                "p99": round(float(np.percentile(values, 99)), 1),
+            }
+
+        timed = [(total, server) for total, server in samples if server is not None]
+        summary["total_ms"] = percentiles([total for total, _ in samples])
+        summary["server_ms"] = percentiles([server for _, server in timed])
+        summary["network_ms"] = percentiles([max(0.0, total - server) for total, server in timed])
+        return summary
+
+
+class Replica:
+    """One OCR server: its circuit breaker, last reported load and our own in-flight requests."""
+
+    def __init__(self, url: str, failure_threshold: int, reset_timeout: float):
+        self.url = url.rstrip("/")
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.healthy = True  # until the first health poll says otherwise
+        self.load = 0.0  # (queued + in-flight) / workers, as reported by /health
+        self.max_workers = 1
+        self.in_flight = 0
+        self.latency_ms: Optional[float] = None  # moving average of successful calls
+        self.checked_at: Optional[float] = None
+
+    def score(self) -> float:
+        """Lower is better: reported load plus requests we sent since the last poll."""
+        return self.load + self.in_flight / self.max_workers
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "circuit": self.breaker.state,
+            "load": round(self.load, 3),
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+        }
+
+
+class _AttemptFailed(Exception):
+    """A retryable failure of one attempt against one replica."""
+
+    def __init__(self, error: OCRClientError, retry_after: Optional[str] = None):
+        super().__init__(str(error))
+        self.error = error
+        self.retry_after = retry_after
+
+
+class OCRClient:
+    """
+    Thread-safe client shared by all uploads of the app.
+
+    Given several server URLs, each request goes to the least-loaded healthy replica, retries fail
+    over to another one, and a slow request can be hedged to a second replica. OCR requests are
+    idempotent, so connection errors, timeouts and 5xx responses are retried.
+    """
+
+    def __init__(self,
+                 base_urls: Union[str, Sequence[str]],
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 120.0,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 10.0,
+                 pool_size: int = 8,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 health_interval: float = 5.0,
+                 hedge_after: Optional[float] = None):
+        """
+        Args:
+            base_urls: Server address(es), e.g. http://38.80.123.152:8000, or a list of replicas
+            connect_timeout: Seconds to establish the TCP connection
+            read_timeout: Seconds to wait for the response (covers queueing and inference)
+            max_retries: Extra attempts after the first one
+            backoff_base: First backoff ceiling in seconds; doubles per attempt (full jitter)
+            backoff_max: Upper bound for a single backoff
+            pool_size: Keep-alive connections kept open per replica; match the number of concurrent uploads
+            failure_threshold: Consecutive failed attempts that open a replica's circuit breaker
+            reset_timeout: Seconds a breaker stays open before a trial call
+            health_interval: Seconds between /health polls of each replica (only with several replicas)
+            hedge_after: Send a second copy of a request to another replica when the first has not
+                answered after this many seconds (None disables hedging)
+        """
+        if isinstance(base_urls, str):
+            base_urls = [base_urls]
+        if not base_urls:
+            raise ValueError("At least one OCR server URL is required")
+
+        self.replicas = [Replica(url, failure_threshold, reset_timeout) for url in base_urls]
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.health_interval = health_interval
+        self.hedge_after = hedge_after
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.replicas), pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.latency = LatencyRecorder()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+        # Hedged requests need a thread per copy in flight
+        self._hedge_pool = ThreadPoolExecutor(max_workers=2 * pool_size) if hedge_after else None
+
+        self._poller = None
+        if len(self.replicas) > 1:
+            self._poller = threading.Thread(target=self._poll_health, name="ocr-health", daemon=True)
+            self._poller.start()
+
+    @property
+    def base_url(self) -> str:
+        return self.replicas[0].url
+
+    def _poll_health(self):
+        """Refresh health and load of every replica until close()."""
+        while not self._stopping.is_set():
+            for replica in self.replicas:
+                self.check_health(replica)
+            self._stopping.wait(self.health_interval)
+
+    def check_health(self, replica: Replica):
+        """Poll one replica's /health. A replica still loading its models counts as unhealthy."""
+        try:
+            response = self.session.get(f"{replica.url}/health", timeout=(self.timeout[0], 5))
+            response.raise_for_status()
+            health = response.json()
+        except (requests.RequestException, ValueError):
+            replica.healthy = False
+        else:
+            executor = health.get("executor", {})
+            max_workers = max(1, executor.get("max_workers", 1))
+            with self._lock:
+                replica.healthy = health.get("readiness", "ready") == "ready"
+                replica.max_workers = max_workers
+                replica.load = (executor.get("queue_depth", 0) + executor.get("in_flight", 0)) / max_workers
+        replica.checked_at = time.time()
+
+    def _pick(self, exclude: Sequence[Replica] = ()) -> Optional[Replica]:
+        """
+        Least-loaded replica whose breaker lets a call through, preferring healthy ones.
+        Unhealthy replicas are still tried when nothing else is left, since health may be stale.
+        """
+        candidates = [replica for replica in self.replicas if replica not in exclude] or list(self.replicas)
+        with self._lock:
+            ranked = sorted(
+                candidates,
+                key=lambda replica: (not replica.healthy, replica.score(), replica.latency_ms or 0.0)
+            )
+        for replica in ranked:
+            if replica.breaker.allow():
+                return replica
+        return None
+
+    def _send(self, replica: Replica, method: str, path: str, kwargs: Dict[str, Any]) -> requests.Response:
+        """
+        One attempt against one replica.
+
+        Raises:
+            OCRClientError: on a 4xx response (not retryable)
+            _AttemptFailed: on a retryable failure
+        """
+        with self._lock:
+            replica.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, replica.url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            replica.breaker.record_failure()
+            raise _AttemptFailed(OCRClientError(f"{replica.url}: {type(e).__name__}: {e}"))
+        finally:
+            with self._lock:
+                replica.in_flight -= 1
+
+        total_ms = 1000 * (time.perf_counter() - started)
+        self.latency.record(total_ms, self._server_ms(response))
+        if response.status_code in RETRY_STATUSES:
+            if response.status_code in BREAKER_STATUSES and not (
+                response.status_code == 503 and "Retry-After" in response.headers
+            ):
+                replica.breaker.record_failure()
+            else:
+                replica.breaker.record_neutral()
+            raise _AttemptFailed(
+                OCRClientError(
+                    f"{response.status_code} - {response.text}", status_code=response.status_code
+                ),
+                retry_after=response.headers.get("Retry-After")
+            )
+
+        # 4xx means the request itself is wrong; the server is fine
+        replica.breaker.record_success()
+        with self._lock:
+            replica.latency_ms = total_ms if replica.latency_ms is None else 0.8 * replica.latency_ms + 0.2 * total_ms
+        if response.status_code >= 400:
+            raise OCRClientError(f"{response.status_code} - {response.text}", status_code=response.status_code)
+        return response
+
+    def _send_hedged(self, replica: Replica, method: str, path: str, kwargs: Dict[str, Any]) -> requests.Response:
+        """Send to replica; if it is slower than hedge_after, also send to a second healthy replica and take the first answer."""
+        first = self._hedge_pool.submit(self._send, replica, method, path, kwargs)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        # Only hedge to a replica known to be healthy; duplicating load onto a sick one makes things worse
+        backup_replica = self._pick(exclude=[replica])
+        if backup_replica is None or backup_replica is replica or not backup_replica.healthy:
+            return first.result()
+
+        self.latency.count(hedges=1)
+        pending = {first, self._hedge_pool.submit(self._send, backup_replica, method, path, kwargs)}
+        failure = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    # The slower copy keeps running; its answer is ignored
+                    return future.result()
+                except _AttemptFailed as e:
+                    failure = e
+        raise failure
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request with retries and failover. kwargs go to requests (data, params, headers, json).
+        The body must be re-sendable (bytes or JSON), not a stream.
+
+        Raises:
+            CircuitOpenError: if the breakers of all replicas are open
+            OCRClientError: on a 4xx response, or when all attempts failed
+        """
+        self.latency.count(calls=1)
+        last_error = None
+        tried = []
+
+        for attempt in range(self.max_retries + 1):
+            # Fail over: prefer a replica this request has not failed on yet
+            replica = self._pick(exclude=tried)
+            if replica is None:
+                self.latency.count(failures=1)
+                retry_in = min(candidate.breaker.retry_in() for candidate in self.replicas)
+                raise CircuitOpenError(
+                    f"OCR server unavailable, circuit open for another {retry_in:.0f}s"
+                    + (f" (last error: {last_error})" if last_error else "")
+                )
+            if attempt:
+                self.latency.count(retries=1)
+
+            try:
+                if self._hedge_pool is not None and len(self.replicas) > 1:
+                    return self._send_hedged(replica, method, path, kwargs)
+                return self._send(replica, method, path, kwargs)
+            except OCRClientError:
+                self.latency.count(failures=1)
+                raise
+            except _AttemptFailed as e:
+                last_error = e.error
+                tried.append(replica)
+                if attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt, e.retry_after))
+
+        self.latency.count(failures=1)
+        raise last_error
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, but never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
+
+    @staticmethod
+    def _server_ms(response: requests.Response) -> Optional[float]:
+        match = SERVER_TIMING.search(response.headers.get("Server-Timing", ""))
+        return float(match.group(1)) if match else None
+
+    def ocr_upload(self, image: Union[bytes, str], **params) -> Dict[str, Any]:
+        """
+        POST raw image bytes to /ocr/upload.
+
+        Args:
+            image: Image bytes, or a path to the image file
+            params: Query parameters, e.g. model_name, response_format, fields
+
+        Returns:
+            The parsed JSON response
+        """
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                image = f.read()
+        response = self.request(
+            "POST", "/ocr/upload",
+            data=image,
+            params=params,
+            headers={"Content-Type": "application/octet-stream"}
+        )
+        return response.json()
+
+    def health(self) -> Dict[str, Any]:
+        return self.request("GET", "/health").json()
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counts, per-replica state and latency percentiles (total / server / network)."""
+        with self._lock:
+            replicas: List[Dict[str, Any]] = [replica.status() for replica in self.replicas]
+        return {"replicas": replicas, **self.latency.summary()}
+
+    def close(self):
+        self._stopping.set()
+        if self._poller is not None:
+            self._poller.join()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1 +1,2 @@
-from .mongo import SimpleMongoManager
\ No newline at end of file
+from .mongo import SimpleMongoManager
+from .write_behind import WriteBehindWriter, DEFAULT_SPOOL_PATH
\ No newline at end of file
@@ -0,0 +1,343 @@
+"""
+Write-behind persistence: documents are journaled to a local spool file and queued in memory, and a
+background thread bulk-inserts them into MongoDB with retries, so callers never wait on the database.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    from bson import ObjectId
+    from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout, PyMongoError, WriteConcernError
+except ImportError:
+    raise ImportError("pymongo is required. Install with: pip install pymongo")
+
+DEFAULT_SPOOL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ocr-mvp", "mongo_spool.jsonl")
+
+DUPLICATE_KEY = 11000
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed insert may succeed unchanged later (network, failover, write concern)."""
+    if isinstance(error, (ConnectionFailure, ExecutionTimeout, WriteConcernError)):
+        return True
+    if isinstance(error, BulkWriteError):
+        return bool(error.details.get("writeConcernErrors"))
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+
+class WriteBehindWriter:
+    """
+    Bounded write-behind queue in front of a SimpleMongoManager.
+
+    Every submitted document is appended (and fsynced) to the spool file before submit returns, and
+    gets its _id assigned up front. The spool doubles as overflow storage: once max_queue documents
+    are waiting in memory, new ones are kept on disk only and read back in order when the writer
+    catches up. Flushed batches are acknowledged in "<spool>.ack"; documents not yet acknowledged
+    are re-queued on the next start, and re-inserting them is harmless because duplicate _ids are
+    ignored. The spool is truncated whenever everything has been written.
+
+    Transient errors (MongoDB unreachable, failover) are retried without limit. A batch that
+    fails max_attempts times for any other reason is inserted one document at a time, and the
+    documents MongoDB still rejects (validation errors, oversized documents) are appended to the
+    dead-letter file "<spool>.dead" with their error, so they no longer hold up the queue.
+    """
+
+    def __init__(self,
+                 connect: Callable[[], Any],
+                 spool_path: str = DEFAULT_SPOOL_PATH,
+                 max_queue: int = 10000,
+                 batch_size: int = 100,
+                 flush_interval: float = 0.5,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 max_attempts: int = 5):
+        """
+        Args:
+            connect: Returns a connected SimpleMongoManager; called from the writer thread, and
+                again after a failed attempt to connect
+            spool_path: Local journal of documents not yet written
+            max_queue: Documents held in memory before new ones wait on disk only
+            batch_size: Documents per insert_many
+            flush_interval: Seconds to wait for a batch to fill up before writing a partial one
+            base_delay: First retry delay in seconds; doubles per consecutive failure
+            max_delay: Retry delay cap in seconds
+            max_attempts: Non-transient failures of a batch before rejected documents are dead-lettered
+        """
+        self.connect = connect
+        self.spool_path = spool_path
+        self.ack_path = spool_path + ".ack"
+        self.dead_letter_path = spool_path + ".dead"
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+        self._cond = threading.Condition()
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._spill_offset: Optional[int] = None  # spool offset of the first record held on disk only
+        self._spilled = 0
+        self._in_flight = 0
+        self._closing = False
+        self._abandon = threading.Event()
+        self._flush_ms: Deque[float] = deque(maxlen=200)
+        self._counters = {"written": 0, "batches": 0, "failures": 0, "consecutive_failures": 0, "dead_lettered": 0}
+        self._last_error: Optional[str] = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(spool_path)), exist_ok=True)
+        self._acked = self._read_ack()
+        self._next_seq = self._recover() + 1
+        self._spool = open(spool_path, "ab")
+
+        self._thread = threading.Thread(target=self._run, name="mongo-write-behind", daemon=True)
+        self._thread.start()
+
+    def _read_ack(self) -> int:
+        try:
+            with open(self.ack_path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_ack(self, seq: int):
+        tmp_path = self.ack_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(seq))
+        os.replace(tmp_path, self.ack_path)
+
+    def _recover(self) -> int:
+        """Re-queue unacknowledged spool records from an earlier run; returns the last sequence number"""
+        if not os.path.exists(self.spool_path):
+            return self._acked
+
+        last_seq, good_end = self._acked, 0
+        with open(self.spool_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    seq = json.loads(line)["seq"]
+                except (ValueError, KeyError):
+                    break  # torn write at the end of the file
+                if seq > self._acked:
+                    if self._spill_offset is None:
+                        self._spill_offset = offset
+                    self._spilled += 1
+                last_seq = max(last_seq, seq)
+                offset += len(line)
+                good_end = offset
+
+        with open(self.spool_path, "r+b") as f:
+            f.truncate(good_end if self._spilled else 0)
+        if self._spilled:
+            print(f"⟳ Re-queued {self._spilled} unsaved documents from {self.spool_path}")
+        return last_seq
+
+    def submit(self, documents: List[Dict[str, Any]]) -> int:
+        """
+        Journal documents and queue them for writing; returns without touching the database.
+
+        Returns:
+            Number of documents accepted
+        """
+        if not documents:
+            return 0
+        now = datetime.utcnow().isoformat()
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("WriteBehindWriter is closed")
+            records, lines = [], []
+            for document in documents:
+                record = {"seq": self._next_seq, "id": str(ObjectId()), "created_at": now, "doc": document}
+                self._next_seq += 1
+                records.append(record)
+                lines.append(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+
+            offset = self._spool.tell()
+            self._spool.write(b"".join(lines))
+            self._spool.flush()
+            os.fsync(self._spool.fileno())
+
+            for record, line in zip(records, lines):
+                # Keep FIFO order: once something waits on disk, everything after it does too
+                if self._spill_offset is None and len(self._queue) < self.max_queue:
+                    self._queue.append(record)
+                else:
+                    if self._spill_offset is None:
+                        self._spill_offset = offset
+                    self._spilled += 1
+                offset += len(line)
+            self._cond.notify_all()
+        return len(documents)
+
+    def _take(self) -> List[Dict[str, Any]]:
+        """Next batch in submission order: memory first, then records read back from the spool"""
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        if not batch and self._spill_offset is not None:
+            with open(self.spool_path, "rb") as f:
+                f.seek(self._spill_offset)
+                while self._spilled and len(batch) < self.batch_size:
+                    line = f.readline()
+                    batch.append(json.loads(line))
+                    self._spilled -= 1
+                self._spill_offset = f.tell() if self._spilled else None
+        return batch
+
+    @staticmethod
+    def _to_mongo(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **record["doc"],
+            "_id": ObjectId(record["id"]),
+            "created_at": datetime.fromisoformat(record["created_at"]),
+        }
+
+    def _insert(self, manager, batch: List[Dict[str, Any]]):
+        try:
+            manager.collection.insert_many([self._to_mongo(record) for record in batch], ordered=False)
+        except BulkWriteError as e:
+            # A retried batch may be partly stored already; those _ids come back as duplicates
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY for error in errors) or e.details.get("writeConcernErrors"):
+                raise
+
+    def _insert_each(self, manager, batch: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Exception]]:
+        """Insert documents one at a time; returns the (record, error) pairs MongoDB keeps rejecting"""
+        rejected = []
+        for record in batch:
+            try:
+                self._insert(manager, [record])
+            except Exception as e:
+                if is_transient(e):
+                    raise
+                rejected.append((record, e))
+        return rejected
+
+    def _dead_letter(self, rejected: List[Tuple[Dict[str, Any], Exception]]):
+        now = datetime.utcnow().isoformat()
+        with open(self.dead_letter_path, "ab") as f:
+            for record, error in rejected:
+                entry = {**record, "error": f"{type(error).__name__}: {error}", "failed_at": now}
+                f.write(json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"✗ {len(rejected)} documents rejected by MongoDB, moved to {self.dead_letter_path}")
+
+    def _run(self):
+        manager = None
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._queue or self._spill_offset is not None or self._closing)
+                    if not self._closing and len(self._queue) < self.batch_size and self._spill_offset is None:
+                        # Give concurrent submits a moment to fill the batch
+                        self._cond.wait_for(
+                            lambda: len(self._queue) >= self.batch_size or self._closing, timeout=self.flush_interval
+                        )
+                    batch = self._take()
+                    if not batch:
+                        return  # closing and drained
+                    self._in_flight = len(batch)
+
+                attempt = permanent_failures = 0
+                rejected = []
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        if manager is None:
+                            manager = self.connect()
+                        if permanent_failures < self.max_attempts:
+                            self._insert(manager, batch)
+                        else:
+                            # Retrying as a whole keeps failing: store what MongoDB accepts, set the rest aside
+                            rejected = self._insert_each(manager, batch)
+                        break
+                    except Exception as e:
+                        attempt += 1
+                        # Failing to connect at all is always worth retrying
+                        if manager is not None and not is_transient(e):
+                            permanent_failures += 1
+                        with self._cond:
+                            self._counters["failures"] += 1
+                            self._counters["consecutive_failures"] = attempt
+                            self._last_error = f"{type(e).__name__}: {e}"
+                        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                        print(f"✗ Saving {len(batch)} documents failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+                        if self._abandon.wait(delay):
+                            return  # close() gave up; the batch stays in the spool for the next start
+
+                if rejected:
+                    self._dead_letter(rejected)
+                with self._cond:
+                    self._acked = batch[-1]["seq"]
+                    self._write_ack(self._acked)
+                    self._in_flight = 0
+                    self._counters["written"] += len(batch) - len(rejected)
+                    self._counters["dead_lettered"] += len(rejected)
+                    self._counters["batches"] += 1
+                    self._counters["consecutive_failures"] = 0
+                    self._flush_ms.append((time.perf_counter() - started) * 1000)
+                    drained = not self._queue and self._spill_offset is None and self._acked == self._next_seq - 1
+                    if drained and not self._spool.closed:
+                        self._spool.truncate(0)
+                        self._spool.seek(0)
+                    self._cond.notify_all()
+                print(f"✓ {len(batch) - len(rejected)} documents saved")
+        finally:
+            if manager is not None:
+                try:
+                    manager.close()
+                except Exception as e:
+                    print(f"✗ Closing the MongoDB connection failed: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is written; False on timeout."""
+        with self._cond:
+            target = self._next_seq - 1
+            return self._cond.wait_for(lambda: self._acked >= target, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, write counters and recent flush latency."""
+        with self._cond:
+            flush_ms = sorted(self._flush_ms)
+            return {
+                "queued": len(self._queue),
+                "spilled": self._spilled,
+                "in_flight": self._in_flight,
+                "pending": self._next_seq - 1 - self._acked,
+                **self._counters,
+                "last_error": self._last_error,
+                "flush_ms": {
+                    "last": round(self._flush_ms[-1], 1) if flush_ms else None,
+                    "p50": round(flush_ms[len(flush_ms) // 2], 1) if flush_ms else None,
+                    "p95": round(flush_ms[int(len(flush_ms) * 0.95)], 1) if flush_ms else None,
+                },
+            }
+
+    def close(self, timeout: Optional[float] = 30.0):
+        """
+        Stop accepting documents and drain the queue. If MongoDB is still unreachable after
+        `timeout` seconds (or never, with None), unsaved documents stay in the spool and are written on the next start.
+        """
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._abandon.set()
+            # The thread may be stuck inside connect(); it is a daemon and its batch is in the spool
+            self._thread.join(1.0)
+        pending = self.stats()["pending"]
+        if pending:
+            print(f"⚠ {pending} unsaved documents kept in {self.spool_path}")
+        self._spool.close()
@@ -0,0 +1 @@
+from .compact import decode_results, unpack_array
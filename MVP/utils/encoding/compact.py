@@ -0,0 +1,45 @@
+"""
+Decoder for the compact OCR response format (packed arrays instead of nested JSON lists).
+Plain JSON results pass through unchanged, so it is safe to use on either format.
+"""
+
+import base64
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Fields the server may send as packed arrays
+PACKED_FIELDS = ("rec_boxes", "rec_scores", "dt_polys")
+
+
+def unpack_array(value: Any, as_list: bool = True):
+    """
+    Unpack a {"dtype", "shape", "data"} packed array.
+
+    Args:
+        value: Packed array, or an already decoded (nested) list
+        as_list: Return nested Python lists (JSON/Mongo friendly) instead of a numpy array
+
+    Returns:
+        The decoded values; anything that is not a packed array is returned unchanged
+    """
+    if not (isinstance(value, dict) and {"dtype", "shape", "data"} <= value.keys()):
+        return value
+
+    array = np.frombuffer(base64.b64decode(value["data"]), dtype=value["dtype"]).reshape(value["shape"])
+    return array.tolist() if as_list else array
+
+
+def decode_results(results: List[Dict], as_list: bool = True) -> List[Dict]:
+    """
+    Decode the 'results' of an OCR response in place, whatever format the server used.
+
+    Args:
+        results: response.json()["results"]
+        as_list: See unpack_array
+    """
+    for entry in results:
+        for key in PACKED_FIELDS:
+            if key in entry:
+                entry[key] = unpack_array(entry[key], as_list=as_list)
+    return results
@@ -1,3 +1,3 @@
 # from .filter_texts import extract_countries, extract_items, extract_weights
-from .filter_texts import filter_text, query_ocr_region
-# from .iok import query_ocr_region
+from .filter_texts import filter_text, query_ocr_region, query_ocr_regions
+# from .iok import query_ocr_region
\ No newline at end of file
@@ -1,6 +1,8 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import re
 
+import numpy as np
+
 from MVP.config import CATEGORY_TO_BBOX
 
 # Reference headlines in different languages for item descriptions
@@ -91,17 +93,25 @@ WEIGHT_LABELS = [
     'miktar', 'quantity', 'quantité', 'ilość', 'weight', 'ağırlık'
 ]
 
+# Templates with at least this many fields query a per-page BoxGridIndex instead of scanning
+# every box per field. region_query_bench.py puts the crossover (index build included) at about
+# 50 fields for 1000+ boxes per page and 100-150 fields for 100-300 boxes. CATEGORY_TO_BBOX has
+# 3 fields, so no current template uses the index; it is there for many-field templates.
+REGION_INDEX_MIN_FIELDS = 100
+
 
-def filter_text(ocr_results: Dict, image_dims: Tuple):
+def filter_text(ocr_results: Dict, image_dims: Tuple, include_texts: bool = False):
     """
     The whole pipeline to filter the outputs from Paddle OCR.
     
     Args:
         ocr_results: Dictinoary of texts and bboxes.
         image_dims: a tuple of width and height - image dimensions
+        include_texts: Also return the OCR texts matched in each field region, with their scores
 
     """
     height, width = image_dims
+    query_bboxes = []
     for key, values in CATEGORY_TO_BBOX.items():
         # print(key.upper())
         x1, y1, w, h = values
@@ -115,8 +125,22 @@ def filter_text(ocr_results: Dict, image_dims: Tuple):
         y1 = int(y1 * height)
         y2 = int(y2 * height)
 
-        query_bbox = [x1, y1, x2, y2]
-        key_bboxes = query_ocr_region(query_bbox=query_bbox, ocr_results=ocr_results, iok_threshold=0.7)
+        query_bboxes.append([x1, y1, x2, y2])
+
+    # All category regions in one pass; with many fields, only boxes near each region are checked
+    index = None
+    if len(query_bboxes) >= REGION_INDEX_MIN_FIELDS:
+        from .spatial_index import BoxGridIndex
+
+        index = BoxGridIndex(ocr_results["rec_boxes"])
+    regions = query_ocr_regions(
+        query_bboxes=query_bboxes, ocr_results=ocr_results, iok_threshold=0.7, index=index
+    )
+
+    texts = {}
+    for key, key_bboxes in zip(CATEGORY_TO_BBOX, regions):
+        if include_texts:
+            texts[key] = [{"text": res["text"], "score": res["score"]} for res in key_bboxes]
         if key == "country":
             countries = extract_countries(ocr_results=key_bboxes)
         
@@ -131,6 +155,12 @@ def filter_text(ocr_results: Dict, image_dims: Tuple):
         "weight": weights,
         "item": items,    
     }
+    if include_texts:
+        info_extracted["texts"] = {
+            "country": texts["country"],
+            "weight": texts["weight"],
+            "item": texts["items"],
+        }
     return info_extracted
 
 def calculate_intersection(box1, box2):
@@ -163,38 +193,121 @@ def calculate_iok(query_box, ocr_box):
     return intersection / key_area
 
 
-def query_ocr_region(query_bbox, ocr_results, iok_threshold=0.5):
+def boxes_to_array(bboxes) -> np.ndarray:
+    """rec_boxes (list of [x1, y1, x2, y2] or array) as an (N, 4) array"""
+    boxes = np.asarray(bboxes)
+    return boxes.reshape(-1, 4) if boxes.size else np.zeros((0, 4))
+
+
+def calculate_iok_array(query, boxes) -> np.ndarray:
     """
-    Query OCR results by bounding box region.
-    
+    Element-wise calculate_iok over broadcastable (..., 4) arrays of [x1, y1, x2, y2].
+    """
+    query = np.asarray(query)
+    boxes = np.asarray(boxes)
+
+    x_left = np.maximum(query[..., 0], boxes[..., 0])
+    y_top = np.maximum(query[..., 1], boxes[..., 1])
+    x_right = np.minimum(query[..., 2], boxes[..., 2])
+    y_bottom = np.minimum(query[..., 3], boxes[..., 3])
+    intersection = np.where(
+        (x_right < x_left) | (y_bottom < y_top), 0.0, (x_right - x_left) * (y_bottom - y_top)
+    )
+
+    key_area = (boxes[..., 2] - boxes[..., 0]) * (boxes[..., 3] - boxes[..., 1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(key_area == 0, 0.0, intersection / key_area)
+
+
+def calculate_iok_matrix(query_boxes, ocr_boxes) -> np.ndarray:
+    """
+    Vectorized calculate_iok: IoK of every OCR box against every query box.
+
     Args:
-        query_bbox: [x, y, w, h] - region of interest
-        ocr_results: List[Dict["bbox": [x, y, w, h], "text": str]]
-        iok_threshold: Minimum IoK to include result (default: 0.5)
-    
+        query_boxes: (Q, 4) regions [x1, y1, x2, y2]
+        ocr_boxes: (N, 4) boxes [x1, y1, x2, y2]
+
+    Returns:
+        (Q, N) float array, same values as calculate_iok(query_boxes[q], ocr_boxes[n])
+    """
+    return calculate_iok_array(np.asarray(query_boxes)[:, None, :], np.asarray(ocr_boxes)[None, :, :])
+
+
+def reading_order(boxes: np.ndarray) -> np.ndarray:
+    """Box indices sorted top-to-bottom, then left-to-right; ties keep their OCR order like list.sort"""
+    return np.lexsort((boxes[:, 0], boxes[:, 1]))
+
+
+def query_region_indices(query_bboxes, bboxes, iok_threshold=0.5) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """
+    Indices of the boxes matching each query region, in reading order (linear scan over all boxes).
+
+    Args:
+        query_bboxes: Regions [x1, y1, x2, y2]
+        bboxes: rec_boxes
+        iok_threshold: Minimum IoK to include a box
+
     Returns:
-        bboxes that highly inersect with query
+        Tuple of (one index array per query, sorted top-to-bottom then left-to-right;
+        the matching IoK values, aligned with the indices)
     """
-    matches = []
+    boxes = boxes_to_array(bboxes)
+    iok = calculate_iok_matrix(np.asarray(query_bboxes).reshape(-1, 4), boxes)
+    order = reading_order(boxes)
+    indices = [order[row[order] >= iok_threshold] for row in iok]
+    return indices, [row[region] for row, region in zip(iok, indices)]
+
 
+def query_ocr_regions(query_bboxes, ocr_results, iok_threshold=0.5, index=None):
+    """
+    query_ocr_region for several regions at once; the IoK of all boxes against all regions is
+    computed in one broadcast instead of a Python loop per box.
+
+    Args:
+        index: BoxGridIndex built from ocr_results["rec_boxes"]; only boxes near each region are
+            checked then, which pays off for templates with many fields
+
+    Returns:
+        One list of matches per query region, as returned by query_ocr_region
+    """
     bboxes = ocr_results["rec_boxes"]
     texts = ocr_results["rec_texts"]
     scores = ocr_results["rec_scores"]
-    for bbox, text, score in zip(bboxes, texts, scores):
-        iok = calculate_iok(query_bbox, bbox)
-        
-        if iok >= iok_threshold:
-            matches.append({
-                "bbox": bbox,
-                "text": text,
-                "score": score,
+    count = min(len(bboxes), len(texts), len(scores))
+    if index is not None:
+        indices, ioks = index.query(query_bboxes, iok_threshold)
+        kept = [region < count for region in indices]
+        indices = [region[keep] for region, keep in zip(indices, kept)]
+        ioks = [iok[keep] for iok, keep in zip(ioks, kept)]
+    else:
+        indices, ioks = query_region_indices(query_bboxes, bboxes[:count], iok_threshold)
+    return [
+        [
+            {
+                "bbox": bboxes[i],
+                "text": texts[i],
+                "score": scores[i],
                 "iok": iok
-            })
+            }
+            for i, iok in zip(region.tolist(), region_ioks.tolist())
+        ]
+        for region, region_ioks in zip(indices, ioks)
+    ]
+
+
+def query_ocr_region(query_bbox, ocr_results, iok_threshold=0.5):
+    """
+    Query OCR results by bounding box region.
     
-    # Sort by position: top-to-bottom, then left-to-right
-    matches.sort(key=lambda x: (x["bbox"][1], x["bbox"][0]))
+    Args:
+        query_bbox: [x1, y1, x2, y2] - region of interest
+        ocr_results: Dict with "rec_boxes" ([x1, y1, x2, y2] each), "rec_texts" and "rec_scores"
+        iok_threshold: Minimum IoK to include result (default: 0.5)
     
-    return matches
+    Returns:
+        bboxes that highly inersect with query, sorted top-to-bottom, then left-to-right
+    """
+    return query_ocr_regions([query_bbox], ocr_results, iok_threshold)[0]
 
 
 def extract_countries(ocr_results: Dict):
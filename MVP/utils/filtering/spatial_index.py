@@ -0,0 +1,126 @@
+"""
+Per-page spatial index over OCR boxes: a uniform grid built once from rec_boxes, so that region
+queries for templates with many fields only check the boxes near each region.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from .filter_texts import boxes_to_array, calculate_iok_array, query_region_indices, reading_order
+
+
+class BoxGridIndex:
+    """
+    Uniform grid over the extent of one page's boxes; each cell lists the boxes overlapping it.
+
+    Query results are identical to query_region_indices (same IoK values, same reading order).
+    Only boxes with a positive area are indexed, since no other box can reach an IoK above 0;
+    queries with iok_threshold <= 0 therefore fall back to the linear scan.
+    """
+
+    def __init__(self, bboxes, boxes_per_cell: float = 4.0):
+        """
+        Args:
+            bboxes: rec_boxes ([x1, y1, x2, y2] each)
+            boxes_per_cell: Target average number of boxes per grid cell
+        """
+        self.boxes = boxes_to_array(bboxes)
+        boxes = self.boxes
+
+        # Position of each box in reading order, to sort matches without re-sorting the boxes
+        self.by_rank = reading_order(boxes)
+        self.rank = np.empty(len(boxes), dtype=np.intp)
+        self.rank[self.by_rank] = np.arange(len(boxes))
+
+        ids = np.flatnonzero((boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1]))
+        if ids.size:
+            self.x0, self.y0 = float(boxes[ids, 0].min()), float(boxes[ids, 1].min())
+            self.x_max, self.y_max = float(boxes[ids, 2].max()), float(boxes[ids, 3].max())
+        else:
+            self.x0 = self.y0 = self.x_max = self.y_max = 0.0
+
+        # About boxes_per_cell boxes per cell, but cells no smaller than a typical box, so that most
+        # boxes are listed in one or two cells per axis
+        width, height = max(self.x_max - self.x0, 1.0), max(self.y_max - self.y0, 1.0)
+        cell_side = np.sqrt(width * height * boxes_per_cell / max(ids.size, 1))
+        box_w = float(np.median(boxes[ids, 2] - boxes[ids, 0])) if ids.size else width
+        box_h = float(np.median(boxes[ids, 3] - boxes[ids, 1])) if ids.size else height
+        self.nx = max(1, min(int(width / max(cell_side, box_w)), 4096))
+        self.ny = max(1, min(int(height / max(cell_side, box_h)), 4096))
+        self.cell_w, self.cell_h = width / self.nx, height / self.ny
+
+        # One (cell, box) entry per cell a box touches, grouped by cell (CSR layout)
+        cols1, cols2 = self._cols(boxes[ids, 0]), self._cols(boxes[ids, 2])
+        rows1, rows2 = self._rows(boxes[ids, 1]), self._rows(boxes[ids, 3])
+        span_w = cols2 - cols1 + 1
+        spans = span_w * (rows2 - rows1 + 1)
+        offsets = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+        span_w = np.repeat(span_w, spans)
+        cells_of = (np.repeat(rows1, spans) + offsets // span_w) * self.nx + np.repeat(cols1, spans) + offsets % span_w
+
+        # Small integer keys let the stable sort use radix sort
+        by_cell = np.argsort(cells_of.astype(np.uint16 if self.nx * self.ny <= 1 << 16 else np.int64), kind="stable")
+        self.cell_boxes = np.repeat(ids, spans)[by_cell]
+        self.cell_starts = np.searchsorted(cells_of[by_cell], np.arange(self.nx * self.ny + 1))
+
+    def _cols(self, x) -> np.ndarray:
+        return np.clip(np.floor((np.asarray(x, dtype=np.float64) - self.x0) / self.cell_w), 0, self.nx - 1).astype(np.intp)
+
+    def _rows(self, y) -> np.ndarray:
+        return np.clip(np.floor((np.asarray(y, dtype=np.float64) - self.y0) / self.cell_h), 0, self.ny - 1).astype(np.intp)
+
+    def candidates(self, query_bboxes) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All (region, box) pairs where the box is listed in a grid cell the region touches.
+
+        Returns:
+            Tuple of (region ids, box ids); a box listed in several of a region's cells repeats
+        """
+        queries = np.asarray(query_bboxes, dtype=np.float64).reshape(-1, 4)
+        inside = (
+            (queries[:, 2] >= self.x0) & (queries[:, 0] <= self.x_max)
+            & (queries[:, 3] >= self.y0) & (queries[:, 1] <= self.y_max)
+        )
+        query_ids = np.flatnonzero(inside) if self.cell_boxes.size else np.zeros(0, dtype=np.intp)
+        col1, col2 = self._cols(queries[query_ids, 0]), self._cols(queries[query_ids, 2])
+        row1, row2 = self._rows(queries[query_ids, 1]), self._rows(queries[query_ids, 3])
+
+        # One (region, grid row) pair per slice: cells of a grid row are contiguous in the CSR layout
+        n_rows = np.maximum(row2 - row1 + 1, 0)
+        slice_query = np.repeat(query_ids, n_rows)
+        slice_row = np.repeat(row1, n_rows) + np.arange(n_rows.sum()) - np.repeat(np.cumsum(n_rows) - n_rows, n_rows)
+        starts = self.cell_starts[slice_row * self.nx + np.repeat(col1, n_rows)]
+        ends = self.cell_starts[slice_row * self.nx + np.repeat(col2, n_rows) + 1]
+        lengths = np.maximum(ends - starts, 0)
+
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return np.repeat(slice_query, lengths), self.cell_boxes[positions]
+
+    def query(self, query_bboxes, iok_threshold: float = 0.5) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Batch region query: candidates of all regions are checked in one vectorized IoK pass.
+
+        Returns:
+            Same as query_region_indices: (index array per region in reading order, matching IoK values)
+        """
+        queries = np.asarray(query_bboxes).reshape(-1, 4)
+        if iok_threshold <= 0:
+            # Boxes that do not overlap a region at all match too
+            return query_region_indices(queries, self.boxes, iok_threshold)
+
+        query_ids, box_ids = self.candidates(queries)
+        keep = calculate_iok_array(queries[query_ids], self.boxes[box_ids]) >= iok_threshold
+
+        # One sorted key per match groups by region, puts boxes in reading order and drops repeats
+        count = len(self.boxes)
+        key = np.sort(query_ids[keep] * count + self.rank[box_ids[keep]])
+        key = key[np.concatenate(([True], key[1:] != key[:-1]))] if key.size else key
+        query_ids, box_ids = key // count, self.by_rank[key % count]
+        iok = calculate_iok_array(queries[query_ids], self.boxes[box_ids])
+
+        bounds = np.searchsorted(query_ids, np.arange(len(queries) + 1))
+        return (
+            [box_ids[start:end] for start, end in zip(bounds[:-1], bounds[1:])],
+            [iok[start:end] for start, end in zip(bounds[:-1], bounds[1:])],
+        )
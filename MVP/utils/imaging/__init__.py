@@ -0,0 +1 @@
+from .shrink import shrink_image, scale_results_to_original
@@ -0,0 +1,121 @@
+"""
+Client-side image shrinking before upload: downsample oversized scans and re-encode them compactly.
+The scale factor is kept so boxes returned by the server can be mapped back to the original image.
+"""
+
+from io import BytesIO
+from typing import Any, Dict, List
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Modes PIL can re-encode as JPEG / WebP after at most a cheap conversion
+SHRINKABLE_MODES = {"1", "L", "LA", "P", "PA", "RGB", "RGBA", "CMYK", "YCbCr"}
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Grayscale stays single-channel; alpha is composited onto white like a paper scan."""
+    if image.mode == "P" and "transparency" in image.info:
+        image = image.convert("RGBA")
+    if image.mode in ("RGBA", "LA", "PA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image.convert("RGBA"), mask=image.getchannel("A"))
+        return background
+    if image.mode == "1":
+        return image.convert("L")
+    if image.mode not in ("L", "RGB"):
+        return image.convert("RGB")
+    return image
+
+
+def shrink_image(data: bytes,
+                 max_side: int = 3500,
+                 max_megapixels: float = 10,
+                 image_format: str = "JPEG",
+                 quality: int = 90) -> Dict[str, Any]:
+    """
+    Downsample an encoded image to fit max_side / max_megapixels and re-encode it.
+
+    The defaults match the server's own preprocessing limits, so the model sees the same
+    resolution either way; only the upload gets smaller. The original bytes (and scale 1.0) are
+    kept when re-encoding would not make them smaller, or when the image cannot be handled (e.g. 16-bit).
+
+    Args:
+        data: Encoded image file
+        max_side: Longest side after shrinking in pixels (0 disables)
+        max_megapixels: Pixel budget after shrinking (0 disables)
+        image_format: PIL format to re-encode to, e.g. "JPEG", "WEBP" or "PNG"
+        quality: Encoder quality for lossy formats
+
+    Returns:
+        Dict with "data" (bytes to upload), "scale" (uploaded / original size),
+        "original_size" (width, height), "original_bytes" and "bytes"
+    """
+    image = Image.open(BytesIO(data))
+    result = {
+        "data": data,
+        "scale": 1.0,
+        "original_size": image.size,
+        "original_bytes": len(data),
+        "bytes": len(data),
+    }
+    if image.mode not in SHRINKABLE_MODES:
+        return result
+
+    # Re-encoding drops EXIF, so apply the orientation now (the server would do the same)
+    image = ImageOps.exif_transpose(image)
+    width, height = image.size
+    result["original_size"] = image.size
+
+    scale = 1.0
+    if max_side and max(width, height) > max_side:
+        scale = min(scale, max_side / max(width, height))
+    if max_megapixels and width * height > max_megapixels * 1e6:
+        scale = min(scale, (max_megapixels * 1e6 / (width * height)) ** 0.5)
+
+    image = _flatten(image)
+    if scale < 1.0:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        # Effective scale, so the mapping back is exact
+        scale = size[0] / width
+
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=quality, optimize=True)
+    encoded = buffer.getvalue()
+
+    # The server downsizes on its own, so the only point of shrinking here is a smaller upload
+    if len(encoded) >= len(data):
+        return result
+    result.update(data=encoded, scale=scale, bytes=len(encoded))
+    return result
+
+
+def scale_results_to_original(results: List[Dict[str, Any]], scale: float, original_size) -> List[Dict[str, Any]]:
+    """
+    Map rec_boxes / dt_polys predicted on a shrunk upload back to original-image pixels
+    and report the original size in image_dims, so filter_text sees the original geometry.
+
+    Args:
+        results: Decoded OCR result entries
+        scale: Factor returned by shrink_image
+        original_size: (width, height) returned by shrink_image
+    """
+    if scale == 1.0:
+        return results
+
+    width, height = original_size
+    mapped = []
+    for entry in results:
+        entry = dict(entry)
+        if "rec_boxes" in entry:
+            entry["rec_boxes"] = np.rint(np.asarray(entry["rec_boxes"], dtype=np.float64) / scale).astype(int).tolist()
+        if "dt_polys" in entry:
+            entry["dt_polys"] = [
+                np.rint(np.asarray(poly, dtype=np.float64) / scale).astype(int).tolist()
+                for poly in entry["dt_polys"]
+            ]
+        if "image_dims" in entry:
+            entry["image_dims"] = [height, width, *entry["image_dims"][2:]]
+        mapped.append(entry)
+    return mapped
@@ -0,0 +1 @@
+from .document import fetch_ocr_results, extract_infos, RESPONSE_FIELDS
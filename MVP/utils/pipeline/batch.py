@@ -0,0 +1,288 @@
+"""
+Headless batch processing: image files -> OCR server -> COO filtering -> MongoDB or JSONL.
+Uploads run on a bounded thread pool, filtering on a process pool; finished inputs are journaled
+so an interrupted run resumes where it stopped.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from MVP.utils.cache import DEFAULT_CACHE_PATH, ResponseCache
+from .document import fetch_ocr_results, extract_infos
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".webp"}
+
+DEFAULT_SERVER_URL = "http://38.80.123.152:8000"
+
+if TYPE_CHECKING:
+    from MVP.utils.client import OCRClient
+
+
+def iter_inputs(sources: Iterable[str], file_list: Optional[str] = None) -> Iterator[str]:
+    """
+    Expand directories (recursively), glob patterns and plain paths into absolute image paths.
+    Each path is yielded once, in sorted order per source.
+    """
+    sources = list(sources)
+    if file_list:
+        with open(file_list, "r", encoding="utf-8") as f:
+            sources.extend(line.strip() for line in f if line.strip())
+
+    seen = set()
+    for source in sources:
+        if os.path.isdir(source):
+            paths = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(source)
+                for name in names
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+            )
+        elif glob.has_magic(source):
+            paths = sorted(glob.glob(source, recursive=True))
+        else:
+            paths = [source]
+
+        for path in paths:
+            path = os.path.abspath(path)
+            if path not in seen and os.path.isfile(path):
+                seen.add(path)
+                yield path
+
+
+class Journal:
+    """Append-only list of inputs whose results were written; read back to resume."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+        self._file = open(path, "a", encoding="utf-8")
+
+    def mark(self, paths: Iterable[str]):
+        for path in paths:
+            self._file.write(path + "\n")
+            self.done.add(path)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, documents: List[Dict[str, Any]]):
+        for document in documents:
+            self._file.write(json.dumps(document, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class MongoWriter:
+    def __init__(self, connection_string: str, database_name: str, collection_name: str):
+        # Imported here so JSONL runs do not need pymongo
+        from MVP.utils.database_management import SimpleMongoManager
+
+        self.manager = SimpleMongoManager(connection_string, database_name, collection_name)
+
+    def write(self, documents: List[Dict[str, Any]]):
+        self.manager.save_batch(documents)
+
+    def close(self):
+        self.manager.close()
+
+
+def run_batch(paths: Iterable[str],
+              client: "OCRClient",
+              writer,
+              journal: Journal,
+              model_choice: str = "PaddleOCR",
+              concurrency: int = 8,
+              kie_workers: Optional[int] = None,
+              flush_size: int = 100,
+              shrink_config: Optional[Dict[str, Any]] = None,
+              cache: Optional[ResponseCache] = None) -> Dict[str, Any]:
+    """
+    Process every path not yet in the journal.
+
+    Args:
+        paths: Image files
+        client: OCR client (size its pool to concurrency)
+        writer: JsonlWriter or MongoWriter; receives lists of documents
+        journal: Inputs already written are skipped, new ones are added after each flush
+        model_choice: Server model name
+        concurrency: Uploads in flight at once
+        kie_workers: Processes running filter_text (default: CPU count)
+        flush_size: Documents per bulk write
+        shrink_config: shrink_image keyword arguments, or None to upload original files
+        cache: Local response cache; hits skip the server
+
+    Returns:
+        Run summary (counts, bytes, elapsed time, throughput, client latency)
+    """
+    summary = {
+        "processed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "cached": 0,
+        "documents": 0,
+        "original_bytes": 0,
+        "uploaded_bytes": 0,
+    }
+    buffer: List[Dict[str, Any]] = []
+    buffered_paths: List[str] = []
+    started = time.perf_counter()
+    next_report = 100
+
+    def flush():
+        if buffer:
+            writer.write(buffer)
+            summary["documents"] += len(buffer)
+        # Journal only after the write went through, so a crash re-processes instead of losing inputs
+        journal.mark(buffered_paths)
+        buffer.clear()
+        buffered_paths.clear()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as uploads, \
+            ProcessPoolExecutor(max_workers=kie_workers) as kie:
+        fetching = {}  # future -> path
+        filtering = {}  # future -> path
+        pending_paths = iter(paths)
+        exhausted = False
+
+        while True:
+            # Keep the upload window full without materialising the whole input list
+            while not exhausted and len(fetching) < 2 * concurrency:
+                path = next(pending_paths, None)
+                if path is None:
+                    exhausted = True
+                elif path in journal.done:
+                    summary["skipped"] += 1
+                else:
+                    future = uploads.submit(fetch_ocr_results, client, path, model_choice, shrink_config, cache)
+                    fetching[future] = path
+
+            if not fetching and not filtering:
+                break
+
+            done, _ = wait(list(fetching) + list(filtering), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    path = fetching.pop(future)
+                    try:
+                        results, upload = future.result()
+                    except Exception as e:
+                        summary["failed"] += 1
+                        print(f"[failed] {path}: {e}", file=sys.stderr)
+                        continue
+                    summary["cached"] += upload["cached"]
+                    summary["original_bytes"] += upload["original_bytes"]
+                    summary["uploaded_bytes"] += upload["bytes"]
+                    filtering[kie.submit(extract_infos, results)] = path
+                else:
+                    path = filtering.pop(future)
+                    try:
+                        infos = future.result()
+                    except Exception as e:
+                        summary["failed"] += 1
+                        print(f"[failed] {path}: {e}", file=sys.stderr)
+                        continue
+                    buffer.extend(
+                        {**info, "source_file": os.path.basename(path), "source_path": path} for info in infos
+                    )
+                    buffered_paths.append(path)
+                    summary["processed"] += 1
+                    if len(buffer) >= flush_size:
+                        flush()
+
+            if summary["processed"] + summary["failed"] >= next_report:
+                next_report += 100
+                rate = summary["processed"] / (time.perf_counter() - started)
+                print(f"[progress] {summary['processed']} processed, {summary['failed']} failed, {rate:.1f} files/s")
+
+    flush()
+    elapsed = time.perf_counter() - started
+    summary.update(
+        elapsed_s=round(elapsed, 2),
+        files_per_s=round(summary["processed"] / elapsed, 2) if elapsed else 0.0,
+        client=client.stats(),
+    )
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="OCR + KIE a directory, glob or list of scans without the Gradio UI"
+    )
+    parser.add_argument("inputs", nargs="*", help="Directories (recursive), glob patterns or image files")
+    parser.add_argument("--file-list", help="Text file with one input path per line")
+    parser.add_argument("--server", default=os.environ.get("OCR_SERVER_URLS", DEFAULT_SERVER_URL),
+                        help="OCR server URL(s), comma-separated (default: $OCR_SERVER_URLS)")
+    parser.add_argument("--model", default="PaddleOCR", help="Server model name")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="Uploads in flight at once")
+    parser.add_argument("--kie-workers", type=int, help="Processes running filter_text (default: CPU count)")
+    parser.add_argument("--flush-size", type=int, default=100, help="Documents per bulk write")
+    parser.add_argument("--shrink", action="store_true",
+                        help="Downscale large scans and re-encode them as JPEG before upload (lossy)")
+    parser.add_argument("--cache", default=os.environ.get("OCR_RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                        help="Local OCR response cache shared with the app (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the server")
+
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--jsonl", help="Append results to this JSONL file")
+    output.add_argument("--mongo", metavar="URI", help="Write results to MongoDB, e.g. mongodb://localhost:27017/")
+    parser.add_argument("--database", default="OCR")
+    parser.add_argument("--collection", default="OCR")
+    parser.add_argument("--journal", help="Resume journal (default: <jsonl>.done, or batch_<collection>.done)")
+    args = parser.parse_args(argv)
+
+    from MVP.utils.client import OCRClient
+
+    if not args.inputs and not args.file_list:
+        parser.error("give at least one input or --file-list")
+
+    journal = Journal(args.journal or (f"{args.jsonl}.done" if args.jsonl else f"batch_{args.collection}.done"))
+    writer = JsonlWriter(args.jsonl) if args.jsonl else MongoWriter(args.mongo, args.database, args.collection)
+    client = OCRClient([url.strip() for url in args.server.split(",") if url.strip()], pool_size=args.concurrency)
+    cache = None if args.no_cache else ResponseCache(args.cache)
+
+    try:
+        summary = run_batch(
+            iter_inputs(args.inputs, args.file_list),
+            client,
+            writer,
+            journal,
+            model_choice=args.model,
+            concurrency=args.concurrency,
+            kie_workers=args.kie_workers,
+            flush_size=args.flush_size,
+            shrink_config={} if args.shrink else None,
+            cache=cache
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+        writer.close()
+        journal.close()
+        client.close()
+
+    print(json.dumps(summary, indent=2))
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Per-document client pipeline shared by the Gradio app and the batch CLI:
+shrink -> upload -> decode -> map boxes back -> COO filtering.
+"""
+
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from MVP.utils.cache import ResponseCache, file_hash
+
+if TYPE_CHECKING:
+    from MVP.utils.client import OCRClient
+
+# Only what filter_text needs, in the compact packed-array encoding (this subset is also
+# what the response cache stores; dt_polys and the other raw fields are never downloaded)
+RESPONSE_FIELDS = "rec_texts,rec_boxes,rec_scores,image_dims"
+
+
+def upload_key(shrink_config: Optional[Dict[str, Any]]) -> str:
+    """Response cache key part for how a file is uploaded: "" for the original bytes, else the shrink settings"""
+    if shrink_config is None:
+        return ""
+    import inspect
+
+    from MVP.utils.imaging import shrink_image
+
+    settings = inspect.signature(shrink_image).bind(b"", **shrink_config)
+    settings.apply_defaults()
+    settings = settings.arguments
+    return (
+        f"{settings['image_format']} q{settings['quality']} "
+        f"{settings['max_side']}px {settings['max_megapixels']:g}MP"
+    )
+
+
+def fetch_ocr_results(client: "OCRClient",
+                      path: str,
+                      model_choice: str,
+                      shrink_config: Optional[Dict[str, Any]] = None,
+                      cache: Optional[ResponseCache] = None,
+                      verbose: bool = False) -> Tuple[List[Dict], Dict[str, Any]]:
+    """
+    OCR one image file on the server, or take the results from the local response cache.
+
+    Args:
+        client: Shared OCR client
+        path: Image file
+        model_choice: Server model name
+        shrink_config: shrink_image keyword arguments, or None to upload the original file
+        cache: Local response cache keyed by file content hash, model_choice and shrink_config
+        verbose: Print when a file cannot be shrunk and is sent as it is
+
+    Returns:
+        Tuple of (decoded results in original-image coordinates, upload summary with
+        original_bytes / bytes / scale / cached)
+
+    Raises:
+        OCRClientError: if the server answers with an error status or cannot be reached
+    """
+    # numpy / PIL load on the first upload instead of at app startup
+    from MVP.utils.encoding import decode_results
+    from MVP.utils.imaging import shrink_image, scale_results_to_original
+
+    with open(path, "rb") as img_file:
+        image_bytes = img_file.read()
+
+    digest = variant = None
+    if cache is not None:
+        # Results of a downscaled JPEG must not be served for the original file, or the other way round
+        digest, variant = file_hash(image_bytes), upload_key(shrink_config)
+        results = cache.get(digest, model_choice, variant)
+        if results is not None:
+            return results, {"original_bytes": len(image_bytes), "bytes": 0, "scale": 1.0, "cached": True}
+
+    upload = {"data": image_bytes, "scale": 1.0, "original_bytes": len(image_bytes), "bytes": len(image_bytes)}
+    if shrink_config is not None:
+        try:
+            upload = shrink_image(image_bytes, **shrink_config)
+        except Exception as e:
+            # Formats PIL cannot open (or 16-bit scans) are sent as they are
+            if verbose:
+                print(f"[upload] {os.path.basename(path)}: sending original ({e})")
+
+    # Raw file bytes to the server (no base64 / JSON wrapping)
+    data = client.ocr_upload(
+        upload["data"],
+        model_name=model_choice,
+        response_format="compact",
+        fields=RESPONSE_FIELDS
+    )
+    results = decode_results(data['results'])
+    # Boxes back to original-image pixels before the CATEGORY_TO_BBOX lookup
+    results = scale_results_to_original(results, upload["scale"], upload.get("original_size"))
+
+    if cache is not None:
+        cache.put(digest, model_choice, results, source=os.path.basename(path), upload=variant)
+
+    summary = {
+        "original_bytes": upload["original_bytes"],
+        "bytes": upload["bytes"],
+        "scale": upload["scale"],
+        "cached": False,
+    }
+    return results, summary
+
+
+def extract_infos(results: List[Dict]) -> List[Dict]:
+    """Run the COO filtering on each result entry (picklable, so it can run in a process pool)."""
+    from MVP.utils.filtering import filter_text
+
+    return [filter_text(res, image_dims=res["image_dims"][:-1]) for res in results]
@@ -0,0 +1,3 @@
+from MVP.utils.pipeline.batch import main
+
+main()